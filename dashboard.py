@@ -1,33 +1,78 @@
-import os, json, pickle, math, io, threading, time, hashlib
+import os, re, json, pickle, gzip, shutil, math, io, threading, queue, time, hashlib, uuid, random, heapq
+from functools import lru_cache
+import importlib.util
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkinter import font as tkfont
 from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from oauth2client.service_account import ServiceAccountCredentials
 
 import gspread
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Image, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from ttkbootstrap.style import Bootstyle
 
+# background threads keep plain references to self.data; with copy-on-write a later change never
+# reaches the frame they hold. Always on (and the option deprecated) from pandas 3.
+if int(pd.__version__.split(".")[0]) < 3:
+    try:
+        pd.set_option("mode.copy_on_write", True)
+    except Exception:
+        pass  # pandas < 2.0 has no CoW; frames are replaced, not mutated, in the app anyway
+
+# parquet engine for pandas; only probed here, pandas imports it on first use
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
 try:
-    from gspread_formatting import cellFormat, numberFormat, format_cell_range
-    HAS_GSFMT = True
+    import orjson
+    HAS_ORJSON = True
 except Exception:
-    HAS_GSFMT = False
+    HAS_ORJSON = False
+
+HAS_XLSXWRITER = importlib.util.find_spec("xlsxwriter") is not None  # faster than openpyxl for to_excel
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except Exception:
+    HAS_XXHASH = False
+
+try:
+    from googleapiclient.discovery import build as build_service
+    HAS_GAPI = True
+except Exception:
+    HAS_GAPI = False
+
+# matplotlib / gspread_formatting are only paid for when the feature is first used;
+# reportlab is imported inside export_pdf.
+_PLT = None
+_GSFMT = None
+
+def _pyplot():
+    global _PLT
+    if _PLT is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        _PLT = (plt, FigureCanvasTkAgg)
+    return _PLT
+
+def _gsfmt():
+    """(cellFormat, numberFormat, format_cell_range), or None without gspread_formatting."""
+    global _GSFMT
+    if _GSFMT is None:
+        try:
+            from gspread_formatting import cellFormat, numberFormat, format_cell_range
+            _GSFMT = (cellFormat, numberFormat, format_cell_range)
+        except Exception:
+            _GSFMT = False
+    return _GSFMT or None
 
 # ============= CONFIG =============
 CONFIG = {
@@ -35,10 +80,26 @@ CONFIG = {
     'backup_folder': 'backups',
     'backup_interval': 3600,
     'auto_save_interval': 300,
+    'backup_min_interval': 300,      # reloads closer together than this share one timestamped backup
+    'backup_backoff_max': 3600,      # cap for the auto-backup retry delay after consecutive failures
+    'parity_interval': 1500,         # background parity check cadence, independent of auto-backups
+    'parity_backoff_max': 3600,      # cap for the parity retry delay after consecutive API errors
     'auto_refresh_seconds': 5,       # << realtime polling interval
+    'checksum_polling': False,       # debug: poll full-sheet checksum instead of Drive revision
+    'push_webhook_address': None,    # public HTTPS URL relayed to push_listen_port -> Drive push channel
+    'push_listen_port': 8765,
+    'safety_poll_seconds': 60,       # poll interval while the push channel is active
+    'push_retry_max': 3600,          # cap for the push channel retry delay after failed listen/watch calls
+    'sync_debounce_ms': 2000,        # change notifications within this window become one fetch
+    'append_flush_ms': 500,          # saved rows are batched into one values.append after this delay
+    'append_max_retries': 5,         # 429/5xx retries per flush (truncated exponential backoff)
+    'append_backoff_max': 32,
+    'append_retry_seconds': 30,      # next flush attempt after a failed one
     'date_format': '%d/%m/%Y %H:%M:%S',
     'backup_limit': 30,
+    'backup_compact_every': 12,      # deltas written before the next backup is a full base again
     'audit_file': 'audit.log',
+    'snapshot_file': 'last_snapshot.parquet',  # last synced sheet, shown instantly on startup
     'idr_decimals': 0,
     'min_balance_thresholds': {
         "BCA": 100_000, "Mandiri": 100_000, "BNI": 100_000, "BRI": 100_000,
@@ -48,6 +109,9 @@ CONFIG = {
     'anomaly_std_multiplier': 3.0
 }
 
+# IDR has no sub-unit: with idr_decimals == 0 money is held as exact integers
+MONEY_DTYPE = np.int64 if CONFIG['idr_decimals'] == 0 else np.float64
+
 BANK_LIST = [
     "BCA", "Mandiri", "BNI", "BRI", "Cimb Niaga", "BTN", "Danamon",
     "DANA", "OVO", "GOPAY", "LINK AJA"
@@ -63,6 +127,18 @@ NEW_STYLE_BANK_COLS = {f"Saldo Akhir {b}": b for b in BANK_LIST}
 MONEY_COLS = ["Credit", "Debit", "Saldo Akhir"] + BANK_LIST
 NON_MONEY_COLS = ["No.", "Tanggal", "User ID", "Bank/EWallet", "Keterangan"]
 
+_TEXT_COLS = [c for c in NON_MONEY_COLS if c != "No."]
+
+# low-cardinality text columns, held as category (int codes) once a frame is loaded
+_CATEGORY_COLS = ("Bank/EWallet", "User ID")
+
+# O(1) lookups for the hot paths
+_BANK_SET = frozenset(BANK_LIST)
+_BANK_INDEX = {b: i for i, b in enumerate(BANK_LIST)}
+_MONEY_COL_SET = frozenset(MONEY_COLS)
+_MIN_BAL_COLS = list(CONFIG['min_balance_thresholds'])
+_MIN_BAL_THR = np.array(list(CONFIG['min_balance_thresholds'].values()), dtype=np.float64)
+
 FONT_BOLD = ("Helvetica", 10, "bold")
 FONT_LARGE_BOLD = ("Helvetica", 14, "bold")
 FONT_XL_BOLD = ("Helvetica", 18, "bold")
@@ -73,14 +149,49 @@ def ensure_dirs():
     if not os.path.exists(CONFIG['backup_folder']):
         os.makedirs(CONFIG['backup_folder'])
 
+# audit records go through a queue to one flusher thread, so callers never wait on the log file
+_audit_q = queue.SimpleQueue()
+_audit_thread = None
+_audit_start_lock = threading.Lock()
+
+def _audit_flusher():
+    while True:
+        batch = [_audit_q.get()]
+        while len(batch) < 256:
+            try: batch.append(_audit_q.get_nowait())
+            except queue.Empty: break
+        lines = [f"[{ts.strftime(CONFIG['date_format'])}] {action}: {details}\n"
+                 for ts, action, details in (r for r in batch if not isinstance(r, threading.Event))]
+        try:
+            if lines:
+                ensure_dirs()
+                with open(os.path.join(CONFIG['backup_folder'], CONFIG['audit_file']), "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+        except OSError as e:
+            print("Audit log error:", e)
+        for r in batch:
+            if isinstance(r, threading.Event):
+                r.set()  # flush_audit_log() waiter: everything queued before it is written
+
 def audit_log(action, details=""):
-    ensure_dirs()
-    path = os.path.join(CONFIG['backup_folder'], CONFIG['audit_file'])
-    ts = datetime.now().strftime(CONFIG['date_format'])
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(f"[{ts}] {action}: {details}\n")
+    global _audit_thread
+    if _audit_thread is None:
+        with _audit_start_lock:
+            if _audit_thread is None:
+                _audit_thread = threading.Thread(target=_audit_flusher, name="audit-log", daemon=True)
+                _audit_thread.start()
+    _audit_q.put((datetime.now(), action, details))
+
+def flush_audit_log(timeout=2.0):
+    """Block until records queued so far are on disk (or timeout); no-op before the first audit_log."""
+    if _audit_thread is None:
+        return
+    done = threading.Event()
+    _audit_q.put(done)
+    done.wait(timeout)
 
 def read_audit_lines(limit=500):
+    flush_audit_log()
     path = os.path.join(CONFIG['backup_folder'], CONFIG['audit_file'])
     if not os.path.exists(path):
         return []
@@ -91,17 +202,24 @@ def read_audit_lines(limit=500):
 def _only_digits(s: str) -> str:
     return "".join(ch for ch in s if ch.isdigit() or ch in ",.-()")
 
+_CLEAN_RE = re.compile(r"(?:Rp|rp|IDR|idr|\s)")
+
+def _round_idr(val: float) -> float:
+    return float(int(round(val))) if CONFIG['idr_decimals'] == 0 else round(val, CONFIG['idr_decimals'])
+
 def parse_amount_idr(s: str) -> float:
     if s is None:
         return 0.0
     if isinstance(s, (int, float)):
-        val = float(s)
-        return float(int(round(val))) if CONFIG['idr_decimals'] == 0 else round(val, CONFIG['idr_decimals'])
-    s = str(s).strip()
+        return _round_idr(float(s))
+    return _parse_amount_idr_str(str(s))
+
+@lru_cache(maxsize=1 << 16)  # UI previews re-parse the same strings on every keystroke
+def _parse_amount_idr_str(s: str) -> float:
+    s = s.strip()
     if s == "":
         return 0.0
-    for token in ["Rp", "rp", "IDR", "idr", " "]:
-        s = s.replace(token, "")
+    s = _CLEAN_RE.sub("", s)
     s = _only_digits(s)
     neg = False
     if s.startswith("(") and s.endswith(")"):
@@ -129,12 +247,15 @@ def parse_amount_idr(s: str) -> float:
         val = 0.0
     if neg:
         val = -val
-    return float(int(round(val))) if CONFIG['idr_decimals'] == 0 else round(val, CONFIG['idr_decimals'])
+    return _round_idr(val)
 
+@lru_cache(maxsize=1 << 16)  # balances repeat a lot ("Rp0 IDR" in most bank columns)
 def fmt_idr(val: float) -> str:
     if val is None or (isinstance(val, float) and np.isnan(val)):
         val = 0
     if CONFIG['idr_decimals'] == 0:
+        if isinstance(val, (int, np.integer)):
+            return f"Rp{format(int(val), ',').replace(',', '.')} IDR"
         try:
             i = int(round(float(val)))
         except Exception:
@@ -144,7 +265,96 @@ def fmt_idr(val: float) -> str:
     s = s.replace(",", "X").replace(".", ",").replace("X", ".")
     return f"Rp{s} IDR"
 
+_THOUSANDS_RE = re.compile(r"\B(?=(\d{3})+(?!\d))")
+
+def fmt_idr_series(s: pd.Series) -> pd.Series:
+    """fmt_idr over a whole column; whole-rupiah columns use string ops instead of per-cell calls."""
+    if CONFIG['idr_decimals'] != 0:
+        return s.map(fmt_idr).astype(object)
+    v = pd.to_numeric(s, errors="coerce").fillna(0)
+    if v.dtype.kind == "f":
+        v = v.where(np.isfinite(v), 0).round()  # fmt_idr prints inf as Rp0 too
+        if v.abs().max() >= 2.0 ** 63:
+            return s.map(fmt_idr).astype(object)  # past int64; Python ints don't overflow
+    return v.astype(np.int64).astype(str).str.replace(_THOUSANDS_RE, ".", regex=True).radd("Rp").add(" IDR").astype(object)
+
+def _last_row_values(df: pd.DataFrame, cols) -> np.ndarray:
+    """Last-row values of cols as float64 (NaN when missing/non-numeric), read cell by cell without building a row Series."""
+    cells = np.array([df[c].iat[-1] if c in df.columns else np.nan for c in cols], dtype=object)
+    return pd.to_numeric(cells, errors="coerce").astype(np.float64)
+
+_NON_AMOUNT_RE = re.compile(r"[^\d,.\-()]")
+
+def _float_or_zero(s: str) -> float:
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+def _parse_amount_idr_series(col: pd.Series) -> pd.Series:
+    """parse_amount_idr over a whole column, using Series string ops instead of per-cell calls.
+    Agrees with _parse_amount_idr_str cell for cell: non-ASCII strings (Unicode digits, which
+    float() accepts and the regexes treat differently) go through it directly, and cleaned
+    values with more than 15 digits use float() because pandas' fast parser rounds them."""
+    col = col.astype(object)
+    is_str = col.map(type).eq(str)
+    out = pd.to_numeric(col.where(~is_str), errors="coerce").fillna(0.0).astype(np.float64)
+    uni = pd.Series(False, index=col.index)
+    if is_str.any():
+        uni[is_str] = ~col[is_str].str.isascii()
+        if uni.any():
+            out[uni] = [_parse_amount_idr_str(v) for v in col[uni]]
+            is_str &= ~uni
+    if is_str.any():
+        s = (col[is_str].str.strip()
+             .str.replace(_CLEAN_RE, "", regex=True)
+             .str.replace(_NON_AMOUNT_RE, "", regex=True))
+        neg = s.str.startswith("(") & s.str.endswith(")")
+        s = s.where(~neg, s.str[1:-1])
+        has_c = s.str.contains(",", regex=False)
+        has_d = s.str.contains(".", regex=False)
+        only_c = has_c & ~has_d
+        comma_decimal = (has_c & has_d & (s.str.rfind(",") > s.str.rfind("."))) | \
+                        (only_c & s.str.fullmatch(r"[^,]*,\d+"))
+        drop_comma = (has_c & ~comma_decimal)
+        drop_dot = has_d & ~has_c & s.str.fullmatch(r"[^.]*(?:\.[^.]{3})+")
+        s = s.where(~comma_decimal, s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+        s = s.where(~drop_comma, s.str.replace(",", "", regex=False))
+        s = s.where(~drop_dot, s.str.replace(".", "", regex=False))
+        long = s.str.count(r"\d") > 15
+        val = pd.to_numeric(s.where(~long, ""), errors="coerce").astype(np.float64).fillna(0.0)
+        if long.any():
+            val[long] = s[long].map(_float_or_zero)
+        out[is_str] = val.where(~neg, -val)
+    return out.round(CONFIG['idr_decimals'])
+
+def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+    for c in _CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+def _same_sheet_rows(a: pd.DataFrame, b: pd.DataFrame, n: int) -> bool:
+    """First n rows of a and b hold the same sheet values. Category sets are ignored (a new bank or
+    user only grows them), and so are derived "_" columns (_is_anomaly shifts as rows are added)."""
+    for c in a.columns:
+        if c.startswith("_"):
+            continue
+        x, y = a[c].iloc[:n], b[c].iloc[:n]
+        if isinstance(x.dtype, pd.CategoricalDtype) or isinstance(y.dtype, pd.CategoricalDtype):
+            x, y = x.astype(object), y.astype(object)
+        if not x.reset_index(drop=True).equals(y.reset_index(drop=True)):
+            return False
+    return True
+
+def _bulk_parse_money_columns(df: pd.DataFrame) -> pd.DataFrame:
+    for c in MONEY_COLS:
+        df[c] = _parse_amount_idr_series(df[c]).astype(MONEY_DTYPE)
+    return df
+
 # ============= GOOGLE SHEETS =============
+_COL_LETTER_CACHE = {}  # 1 -> "A", 27 -> "AA", ...
+
 class GoogleSheetsManager:
     def __init__(self):
         self.scope = [
@@ -154,6 +364,8 @@ class GoogleSheetsManager:
         ]
         self.creds = None
         self.client = None
+        self.service = None  # Sheets v4 REST client (values.batchGet)
+        self.drive_service = None  # Drive v3 client (file revision for change detection)
         self.spreadsheet = None
         self.sheet = None
         self.last_sync = None
@@ -161,6 +373,20 @@ class GoogleSheetsManager:
         self.sheet_id = None
         self.sheet_name = "Money Manager Pro"
         self.last_checksum = None  # checksum isi sheet terakhir
+        self.last_revision = None  # Drive version/modifiedTime saat get_all_data terakhir
+        self.row_count = 0  # data rows of the last fetch; rows 1..row_count+1 hash to last_checksum (get_tail)
+        self.changed = threading.Event()  # set by Drive push notifications
+        self.watch_channel = None
+        self._push_server = None
+        self._push_fails = 0  # consecutive ensure_push_channel failures; polling meanwhile
+        self._push_retry_at = 0.0  # time.monotonic() before which no new listen/watch is tried
+        # loader, watcher and parity threads share the API clients (httplib2 is not thread-safe)
+        self._api_lock = threading.RLock()
+        self._pending_appends = []  # cleaned rows saved locally, not yet sent
+        self._inflight = []  # batch a flush is sending right now
+        self._sent = []  # rows sent but maybe not in the app's data yet; dropped by pending_rows(after_no)
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time keeps row order
 
     def connect(self):
         try:
@@ -169,6 +395,14 @@ class GoogleSheetsManager:
             self.creds = ServiceAccountCredentials.from_json_keyfile_name(
                 CONFIG['credentials_file'], self.scope)
             self.client = gspread.authorize(self.creds)
+            if HAS_GAPI:
+                try:
+                    self.service = build_service("sheets", "v4", credentials=self.creds, cache_discovery=False)
+                    self.drive_service = build_service("drive", "v3", credentials=self.creds, cache_discovery=False)
+                except Exception as e:
+                    print("Sheets API client gagal, pakai gspread:", e)
+                    self.service = None
+                    self.drive_service = None
             self.connected = True
             audit_log("GSheets Connect", "Berhasil")
             return True
@@ -199,8 +433,10 @@ class GoogleSheetsManager:
             return False
 
     def _apply_currency_format(self):
-        if not HAS_GSFMT:
+        gsfmt = _gsfmt()
+        if gsfmt is None:
             return
+        cellFormat, numberFormat, format_cell_range = gsfmt
         try:
             last_col_idx = 8 + len(BANK_LIST)
             start_col = 6
@@ -211,11 +447,14 @@ class GoogleSheetsManager:
             print("Format gagal:", e)
 
     def _col_letter(self, n):
-        s = ""
-        while n > 0:
-            n, r = divmod(n-1, 26)
+        s = _COL_LETTER_CACHE.get(n)
+        if s is not None:
+            return s
+        s, k = "", n
+        while k > 0:
+            k, r = divmod(k-1, 26)
             s = chr(65+r) + s
-        return s
+        return _COL_LETTER_CACHE.setdefault(n, s)
 
     def ensure_headers(self):
         headers = self.sheet.row_values(1)
@@ -236,15 +475,39 @@ class GoogleSheetsManager:
             self._apply_currency_format()
             audit_log("Init Headers & Row", "Saldo Awal 0")
 
+    def _sheet_range(self):
+        # A bare sheet title means "the used range" to the values API
+        return "'" + self.sheet.title.replace("'", "''") + "'"
+
+    def _values_batch_get(self, ranges):
+        with self._api_lock:
+            resp = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.sheet_id, ranges=ranges, majorDimension="ROWS",
+                valueRenderOption="UNFORMATTED_VALUE",
+                dateTimeRenderOption="FORMATTED_STRING"
+            ).execute()
+        return [vr.get("values", []) for vr in resp.get("valueRanges", [])]
+
     # ======== NEW: low-level fetch with UNFORMATTED values (true source of truth)
     def _get_all_values_unformatted(self):
-        return self.sheet.get_all_values(
-            value_render_option='UNFORMATTED_VALUE',
-            date_time_render_option='FORMATTED_STRING'
-        )
+        if self.service is not None:
+            return self._values_batch_get([self._sheet_range()])[0]
+        with self._api_lock:
+            return self.sheet.get_all_values(
+                value_render_option='UNFORMATTED_VALUE',
+                date_time_render_option='FORMATTED_STRING'
+            )
 
     def _compute_checksum(self, values_2d):
         # Compact but stable checksum for change detection
+        if HAS_XXHASH:
+            # stream row by row: no full-payload string, and xxh3 is far cheaper than SHA-1
+            h = xxhash.xxh3_64()
+            for row in values_2d:
+                h.update(repr(row).encode("utf-8"))
+            return h.hexdigest()
+        if HAS_ORJSON:
+            return hashlib.sha1(orjson.dumps(values_2d)).hexdigest()
         packed = json.dumps(values_2d, ensure_ascii=False, separators=(",", ":"))
         return hashlib.sha1(packed.encode("utf-8")).hexdigest()
 
@@ -256,51 +519,125 @@ class GoogleSheetsManager:
             print("Checksum error:", e)
             return None
 
+    def _get_revision(self):
+        """Kilobyte-sized Drive metadata that changes only when the sheet mutates."""
+        try:
+            with self._api_lock:
+                meta = self.drive_service.files().get(
+                    fileId=self.sheet_id, fields="modifiedTime,version", supportsAllDrives=True
+                ).execute()
+            return f"{meta.get('version')}:{meta.get('modifiedTime')}"
+        except Exception as e:
+            print("Revision error:", e)
+            return None
+
+    # ======== Drive push notifications (files.watch)
+    def _start_push_listener(self):
+        manager = self
+
+        class _PushHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                channel = manager.watch_channel or {}
+                state = self.headers.get("X-Goog-Resource-State", "")
+                # "sync" is the handshake sent right after files.watch, not a change
+                if self.headers.get("X-Goog-Channel-ID") == channel.get("id") and state != "sync":
+                    manager.changed.set()
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._push_server = ThreadingHTTPServer(("127.0.0.1", CONFIG['push_listen_port']), _PushHandler)
+        threading.Thread(target=self._push_server.serve_forever, daemon=True).start()
+
+    def ensure_push_channel(self):
+        """Open (or renew before expiry) the Drive watch channel; False means poll instead."""
+        address = CONFIG['push_webhook_address']
+        if not address or self.drive_service is None:
+            return False
+        ch = self.watch_channel
+        if ch and int(ch.get("expiration") or 0) / 1000 > time.time() + 60:
+            return True
+        if time.monotonic() < self._push_retry_at:
+            return False  # backing off after a failure: keep polling
+        try:
+            if self._push_server is None:
+                self._start_push_listener()
+            self.stop_push_channel()
+            channel_id = str(uuid.uuid4())
+            with self._api_lock:
+                resp = self.drive_service.files().watch(
+                    fileId=self.sheet_id, supportsAllDrives=True,
+                    body={"id": channel_id, "type": "web_hook", "address": address}
+                ).execute()
+            self.watch_channel = {"id": channel_id, "resourceId": resp.get("resourceId"),
+                                  "expiration": resp.get("expiration")}
+            self._push_fails = 0
+            audit_log("Push Channel", channel_id)
+            return True
+        except Exception as e:
+            self.watch_channel = None
+            self._push_fails += 1
+            # port in use / watch rejected rarely fixes itself within seconds: back off, log once
+            self._push_retry_at = time.monotonic() + min(CONFIG['safety_poll_seconds'] * 2 ** (self._push_fails - 1), CONFIG['push_retry_max'])
+            if self._push_fails == 1:
+                print("Push channel gagal:", e)
+                audit_log("Push Channel Failed", str(e))
+            return False
+
+    def stop_push_channel(self):
+        ch, self.watch_channel = self.watch_channel, None
+        if not ch:
+            return
+        try:
+            with self._api_lock:
+                self.drive_service.channels().stop(body={"id": ch["id"], "resourceId": ch["resourceId"]}).execute()
+        except Exception as e:
+            print("Stop channel error:", e)
+
+    def _values_to_frame(self, vals) -> pd.DataFrame:
+        """Header row + data rows -> HEADERS-shaped frame with parsed money columns."""
+        header, rows = vals[0], vals[1:]
+        idx = {h: i for i, h in enumerate(header)}
+        raw = pd.DataFrame(rows, dtype=object)
+        width = raw.shape[1]
+
+        def column(name):
+            i = idx.get(name)
+            # accept "Saldo Akhir BCA" -> "BCA"
+            if (i is None or i >= width) and name in _BANK_SET:
+                i = idx.get(f"Saldo Akhir {name}")
+            if i is None or i >= width:
+                return pd.Series("", index=raw.index, dtype=object)
+            return raw[i]
+
+        df = pd.DataFrame({h: column(h) for h in HEADERS}, columns=HEADERS)
+        df[NON_MONEY_COLS] = df[NON_MONEY_COLS].fillna("")
+        # UNFORMATTED_VALUE returns a hand-typed number in a text column as int/float; mixed
+        # object columns would make every Arrow backup/snapshot fail
+        df[_TEXT_COLS] = df[_TEXT_COLS].astype(str)
+        df = _bulk_parse_money_columns(df)
+        df["No."] = pd.to_numeric(df["No."], errors="coerce").fillna(0).astype("int32")
+        return df
+
     def get_all_data(self) -> pd.DataFrame:
         """
         Read the entire sheet using UNFORMATTED_VALUE so numbers stay numeric.
         Recompute running balances locally so UI == API every time.
         """
         try:
+            # read the revision first: a write landing mid-fetch then shows up as a new revision
+            if self.drive_service is not None:
+                self.last_revision = self._get_revision()
             vals = self._get_all_values_unformatted()
             if not vals or len(vals) < 2:
                 self.last_checksum = self._compute_checksum(vals if vals else [])
+                self.row_count = 0
                 return pd.DataFrame(columns=HEADERS)
+            self.row_count = len(vals) - 1
 
-            header = vals[0]
-            rows = vals[1:]
-
-            # Map header names to index
-            idx = {h: i for i, h in enumerate(header)}
-
-            def get_cell(r, name, default=""):
-                if name in idx and idx[name] < len(r):
-                    return r[idx[name]]
-                # accept "Saldo Akhir BCA" -> "BCA"
-                if name in BANK_LIST:
-                    alt = f"Saldo Akhir {name}"
-                    if alt in idx and idx[alt] < len(r):
-                        return r[idx[alt]]
-                return default
-
-            # Build normalized dict rows
-            norm = []
-            for r in rows:
-                item = {}
-                for h in HEADERS:
-                    v = get_cell(r, h, "")
-                    if h in MONEY_COLS:
-                        item[h] = parse_amount_idr(v)
-                    else:
-                        item[h] = v
-                # coerce No.
-                try:
-                    item["No."] = int(item.get("No.", 0) or 0)
-                except Exception:
-                    item["No."] = 0
-                norm.append(item)
-
-            df = pd.DataFrame(norm, columns=HEADERS)
+            df = self._values_to_frame(vals)
             if df.empty:
                 self.last_checksum = self._compute_checksum(vals)
                 return df
@@ -308,7 +645,10 @@ class GoogleSheetsManager:
             # Always recompute balances from the sheet order
             df = recompute_all_balances(df)
             df = df[HEADERS].copy()
-            df["No."] = range(1, len(df)+1)
+            df["No."] = np.arange(1, len(df)+1, dtype=np.int32)
+            df["_is_anomaly"] = compute_anomaly_mask(df)
+            df["_tgl"] = pd.to_datetime(df["Tanggal"], format=CONFIG['date_format'], errors='coerce', cache=True)
+            df = _categorize(df)
 
             # Save checksum for realtime watcher
             self.last_checksum = self._compute_checksum(vals)
@@ -318,53 +658,189 @@ class GoogleSheetsManager:
             print("Error get_all_data:", e)
             return pd.DataFrame(columns=HEADERS)
 
+    def get_tail(self):
+        """
+        Rows appended since the last get_all_data/get_tail, as a parsed frame (money columns
+        parsed, balances not yet recomputed). None when the change was not a pure append:
+        the header or any already-known row changed (their checksum differs), or rows were removed.
+        """
+        if not self.row_count or self.last_checksum is None:
+            return None
+        vals = self._get_all_values_unformatted()
+        known = self.row_count + 1  # header + known data rows
+        if len(vals) <= known or self._compute_checksum(vals[:known]) != self.last_checksum:
+            return None
+        # the API call dominates; skipping the full reparse/recompute/redraw is what the tail saves
+        tail = self._values_to_frame([vals[0]] + vals[known:])
+        self.row_count = len(vals) - 1
+        self.last_checksum = self._compute_checksum(vals)
+        self.last_sync = datetime.now()
+        return tail
+
     def append_data(self, row_list):
+        """Queue a row locally; flush_appends() sends all queued rows in one request."""
+        if not self.connected or self.sheet is None:
+            return False
         try:
             row_clean = []
             for i, v in enumerate(row_list):
                 col = HEADERS[i]
-                if col in MONEY_COLS:
+                if col in _MONEY_COL_SET:
                     try:
                         row_clean.append(float(v))
                     except Exception:
                         row_clean.append(parse_amount_idr(str(v)))
                 else:
                     row_clean.append(v)
-            self.sheet.append_row(row_clean, value_input_option="RAW")
-            self.last_sync = datetime.now()
-            audit_log("Append Row", str(row_clean[:8]) + " ...")
+            with self._pending_lock:
+                self._pending_appends.append(row_clean)
+            audit_log("Queue Row", str(row_clean[:8]) + " ...")
             return True
         except Exception as e:
             print("Append error:", e)
             audit_log("Append Failed", str(e))
             return False
 
+    def pending_rows(self, after_no=0):
+        """Queued, in-flight and sent-but-unloaded rows numbered after after_no (the app's last No.)."""
+        with self._pending_lock:
+            self._sent = [r for r in self._sent if int(r[0]) > after_no]
+            return [r for r in self._sent + self._inflight + self._pending_appends if int(r[0]) > after_no]
+
+    def has_unsent(self):
+        with self._pending_lock:
+            return bool(self._pending_appends or self._inflight)
+
+    def _http_status(self, e):
+        resp = getattr(e, "resp", None)  # googleapiclient HttpError
+        if resp is not None:
+            return getattr(resp, "status", None)
+        return getattr(getattr(e, "response", None), "status_code", None)  # gspread APIError
+
+    def flush_appends(self, attempts=None, lock_timeout=-1):
+        """Send every queued row with one values.append; rows stay queued if it fails.
+        attempts caps the retries (default append_max_retries) and lock_timeout the wait for a
+        flush already running; the close path uses 1 attempt and a short wait."""
+        if not self._flush_lock.acquire(timeout=lock_timeout):
+            return False
+        try:
+            return self._flush_batch(CONFIG['append_max_retries'] if attempts is None else attempts)
+        finally:
+            self._flush_lock.release()
+
+    def _flush_batch(self, attempts):
+        with self._pending_lock:
+            batch, self._pending_appends = self._pending_appends, []
+            self._inflight = batch
+        if not batch:
+            return True
+        delay, err = 1.0, None
+        for attempt in range(attempts):
+            try:
+                with self._api_lock:
+                    if self.service is not None:
+                        self.service.spreadsheets().values().append(
+                            spreadsheetId=self.sheet_id, range=self._sheet_range(),
+                            valueInputOption="RAW", insertDataOption="INSERT_ROWS",
+                            body={"values": batch}
+                        ).execute()
+                    else:
+                        self.sheet.append_rows(batch, value_input_option="RAW")
+                self.last_sync = datetime.now()
+                with self._pending_lock:
+                    self._sent.extend(batch); self._inflight = []
+                audit_log("Append Rows", f"{len(batch)} baris")
+                return True
+            except Exception as e:
+                err = e
+                status = self._http_status(e)
+                if status != 429 and not (status and status >= 500) or attempt == attempts - 1:
+                    break  # no sleep after the last attempt
+                time.sleep(min(delay, CONFIG['append_backoff_max']) + random.random())
+                delay *= 2
+        # keep them at the front so a later flush preserves sheet order
+        with self._pending_lock:
+            self._pending_appends[:0] = batch; self._inflight = []
+        print("Append error:", err)
+        audit_log("Append Failed", str(err))
+        return False
+
 # ============= RECOMPUTE CORE =============
 def recompute_all_balances(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Running balance per bank, vectorized: every row adds (credit - debit) to its
+    bank column, and a SYSTEM/SALDO AWAL row resets all banks to its own values.
+    Balances are written into df in place (callers pass a freshly built frame).
+    """
     for b in BANK_LIST:
         if b not in df.columns:
             df[b] = 0.0
-    running = {b: 0.0 for b in BANK_LIST}
-    out_rows = []
-    for _, r in df.iterrows():
-        r = r.copy()
-        bank = str(r.get("Bank/EWallet", "")).strip()
-        user = str(r.get("User ID", "")).strip().upper()
-        credit = float(r.get("Credit", 0) or 0)
-        debit = float(r.get("Debit", 0) or 0)
-        is_system_init = (user == "SYSTEM" and bank.upper() == "SALDO AWAL")
-        if is_system_init:
-            for b in BANK_LIST:
-                val = r.get(b)
-                running[b] = float(val) if pd.notna(val) else 0.0
-        else:
-            if bank in BANK_LIST:
-                running[bank] += (credit - debit)
-        for b in BANK_LIST:
-            r[b] = running[b]
-        r["Saldo Akhir"] = sum(running.values())
-        out_rows.append(r)
-    return pd.DataFrame(out_rows)
+    n = len(df)
+    if n == 0:
+        df["Saldo Akhir"] = MONEY_DTYPE(0)
+        return df
+    bank = df["Bank/EWallet"].astype(str).str.strip()
+    user = df["User ID"].astype(str).str.strip().str.upper()
+    credit = pd.to_numeric(df["Credit"], errors="coerce").fillna(0).to_numpy(dtype=MONEY_DTYPE)
+    debit = pd.to_numeric(df["Debit"], errors="coerce").fillna(0).to_numpy(dtype=MONEY_DTYPE)
+    is_init = ((user == "SYSTEM") & (bank.str.upper() == "SALDO AWAL")).to_numpy()
+
+    # per-row delta matrix (N, B); SALDO AWAL rows contribute nothing themselves
+    col_idx = bank.map(_BANK_INDEX).to_numpy()
+    valid = pd.notna(col_idx) & ~is_init
+    delta = np.zeros((n, len(BANK_LIST)), dtype=MONEY_DTYPE)
+    rows = np.arange(n)[valid]
+    delta[rows, col_idx[valid].astype(np.intp)] = (credit - debit)[valid]
+
+    # segment 0 starts from zero, segment k starts at the k-th SALDO AWAL row
+    seg_id = np.cumsum(is_init)
+    init_vals = df.loc[is_init, BANK_LIST].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=MONEY_DTYPE)
+    zero = np.zeros((1, len(BANK_LIST)), dtype=MONEY_DTYPE)
+    base = np.vstack([zero, init_vals])
+    csum = np.cumsum(delta, axis=0)
+    seg_start = np.vstack([zero, csum[is_init]])
+    balances = base[seg_id] + csum - seg_start[seg_id]
+
+    df[BANK_LIST] = balances
+    df["Saldo Akhir"] = balances.sum(axis=1)
+    return df
+
+def compute_anomaly_mask(df: pd.DataFrame) -> pd.Series:
+    """
+    Flag rows whose amount (max of Credit/Debit) is more than anomaly_std_multiplier
+    standard deviations above the mean amount of the same Bank/EWallet.
+    """
+    amt = np.maximum(df["Credit"].to_numpy(dtype=np.float64), df["Debit"].to_numpy(dtype=np.float64))
+    if amt.size == 0:
+        return pd.Series(False, index=df.index, dtype=bool)
+    # per-bank mean/std with bincount over group codes: two passes over flat arrays, no groupby
+    # a missing bank is a group of its own (code -1 / NaN), like any other unknown name
+    bank = df["Bank/EWallet"]
+    if isinstance(bank.dtype, pd.CategoricalDtype):
+        _, code = np.unique(bank.cat.codes.to_numpy(), return_inverse=True)
+        code = code.ravel()
+    else:
+        code, _ = pd.factorize(bank, use_na_sentinel=False)
+    n = np.bincount(code)
+    mean = (np.bincount(code, weights=amt) / n)[code]
+    dev = amt - mean
+    std = np.sqrt(np.bincount(code, weights=dev * dev) / n)[code]
+    mask = (std > 0) & (amt > mean + CONFIG['anomaly_std_multiplier'] * std)
+    return pd.Series(mask, index=df.index)
+
+def _linfit_forecast(y: np.ndarray, days: int) -> np.ndarray:
+    """Least-squares line through (0..n-1, y), extended `days` steps; closed form instead of polyfit."""
+    n = y.shape[0]
+    xm = (n - 1) / 2.0
+    dx = np.arange(n) - xm
+    a = np.dot(dx, y - y.mean()) / np.dot(dx, dx)
+    b = y.mean() - a * xm
+    return a * np.arange(n, n + days) + b
+
+def _fig_png(fig) -> bytes:
+    # constrained_layout already trims the margins, so no bbox_inches='tight' second pass
+    buf = io.BytesIO(); fig.savefig(buf, format='png', dpi=120)
+    return buf.getvalue()
 
 # ============= APP =============
 class MoneyManagerPro(tb.Window):
@@ -383,7 +859,7 @@ class MoneyManagerPro(tb.Window):
         self.gsheets = GoogleSheetsManager()
         self.backup = BackupManager()
         self.data = pd.DataFrame(columns=HEADERS)
-        self.filtered_data = self.data.copy()
+        self.filtered_data = self.data
         self.current_page = 0
         self.rows_per_page = 25
         self.user_settings = {'default_user':'','default_bank':'','auto_save':True,'theme':'litera'}
@@ -392,6 +868,26 @@ class MoneyManagerPro(tb.Window):
         self.parity_state = tk.StringVar(value="Unknown")
         self.parity_details_last = ""
         self._last_sheet_checksum = None  # for realtime watcher
+        self._last_revision = None
+        self._fmt_cache = None  # self.data with MONEY_COLS pre-formatted for display
+        self._display_rows = []  # _fmt_cache[HEADERS] as plain lists, positional == self.data index
+        self._fidx = None  # per-row arrays apply_filters masks on, see _rebuild_filter_index
+        self._charts_stale = False  # charts skipped while their tab was hidden
+        self._loading = False
+        self._reload_pending = False
+        self._flush_after_id = None
+        self._amount_after_id = None
+        self._tail_after_id = None
+        self._tail_syncing = False
+        self._last_backup_t = float("-inf")  # time.monotonic() of the last reload backup
+        self._data_version = 0  # bumped whenever self.data is replaced or extended
+        self._last_saved_version = -1  # _data_version of the last successful backup
+        self._warn_cache = (-1, "")  # (_data_version, joined min-balance warnings) for update_status
+        self._bk_q = queue.Queue(maxsize=1)  # (snapshot, version) for _bk_writer; a newer snapshot replaces a pending one
+        self._bk_thread = None
+        self._bk_retry_at = 0.0  # time.monotonic() before which auto_bak does not queue after a failed write
+        self._stop = threading.Event()  # set on close; background loops wait on it instead of sleeping
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self._build_menu()
         self._build_statusbar()
@@ -407,6 +903,7 @@ class MoneyManagerPro(tb.Window):
         self._build_filter_panel(self.tab_transaksi)
         self._build_table(self.tab_transaksi)
         self._build_charts(self.tab_transaksi)
+        self.tab_transaksi.bind("<Map>", self._on_charts_visible)
         self._build_user_summary(self.tab_user)
         self._build_audit_panel(self.tab_audit)
 
@@ -448,14 +945,14 @@ class MoneyManagerPro(tb.Window):
         file_menu.add_command(label="Export CSV", command=self.export_csv)
         file_menu.add_command(label="Export PDF", command=self.export_pdf)
         file_menu.add_separator()
-        file_menu.add_command(label="Keluar", command=self.destroy)
+        file_menu.add_command(label="Keluar", command=self._on_close)
         m.add_cascade(label="File", menu=file_menu)
 
         actions_menu = tk.Menu(m, tearoff=0)
         actions_menu.add_command(label="Transfer Antar Bank", command=self.open_transfer_dialog)
         actions_menu.add_separator()
         actions_menu.add_command(label="Reload dari Google Sheets", command=self.load_data)
-        actions_menu.add_command(label="Cek Kesesuaian (Dashboard ↔ API)", command=self.check_parity_against_api)
+        actions_menu.add_command(label="Cek Kesesuaian (Dashboard ↔ API)", command=lambda: threading.Thread(target=self.check_parity_against_api, daemon=True).start())
         m.add_cascade(label="Aksi", menu=actions_menu)
 
         view_menu = tk.Menu(m, tearoff=0)
@@ -479,9 +976,11 @@ class MoneyManagerPro(tb.Window):
         last = self.gsheets.last_sync.strftime(CONFIG['date_format']) if self.gsheets.last_sync else "-"
         conn = "Online" if self.gsheets.connected else "Offline"
         base = f"Status: {conn} | Last Sync: {last}"
-        warnings = self.check_min_balance(self.data)
-        if warnings:
-            base += " | ⚠ " + "; ".join(warnings)
+        # the warnings only depend on the last row, so they are rebuilt once per data version
+        if self._warn_cache[0] != self._data_version:
+            self._warn_cache = (self._data_version, "; ".join(self.check_min_balance(self.data)))
+        if self._warn_cache[1]:
+            base += " | ⚠ " + self._warn_cache[1]
         base += f" | Parity: {self.parity_state.get()}"
         if msg:
             base += f" | {msg}"
@@ -521,10 +1020,7 @@ class MoneyManagerPro(tb.Window):
         ttk.Label(fr, text="Jumlah (IDR):", **label_style).grid(row=1, column=2, sticky=tk.W, padx=5, pady=2)
         self.amount_entry = ttk.Entry(fr, width=25, font=FONT_BOLD); self.amount_entry.grid(row=1, column=3, padx=5, pady=2)
         self.amount_preview = ttk.Label(fr, text="Terbaca: Rp0 IDR", font=FONT_BOLD, foreground="#00695C"); self.amount_preview.grid(row=1, column=4, sticky=tk.W, padx=10)
-        def _on_amount_change(_evt=None):
-            val = parse_amount_idr(self.amount_entry.get())
-            self.amount_preview.config(text=f"Terbaca: {fmt_idr(val)}")
-        self.amount_entry.bind("<KeyRelease>", _on_amount_change); self.amount_entry.bind("<FocusOut>", _on_amount_change)
+        self.amount_entry.bind("<KeyRelease>", self._on_amount_change); self.amount_entry.bind("<FocusOut>", self._do_amount_preview)
 
         ttk.Label(fr, text="Keterangan:", **label_style).grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
         self.desc_entry = ttk.Entry(fr, width=80, font=FONT_BOLD); self.desc_entry.grid(row=2, column=1, columnspan=3, padx=5, pady=2, sticky=tk.W)
@@ -536,6 +1032,17 @@ class MoneyManagerPro(tb.Window):
         tb.Button(btn, text="Transfer Antar Bank", bootstyle="outline-info", command=self.open_transfer_dialog, width=18).pack(side=tk.LEFT, padx=5)
         self.bind("<Control-s>", lambda e: self.save_transaction())
 
+    def _on_amount_change(self, _evt=None):
+        # debounce: only the last keystroke within 120ms re-parses the amount
+        if self._amount_after_id:
+            self.after_cancel(self._amount_after_id)
+        self._amount_after_id = self.after(120, self._do_amount_preview)
+
+    def _do_amount_preview(self, _evt=None):
+        self._amount_after_id = None
+        val = parse_amount_idr(self.amount_entry.get())
+        self.amount_preview.config(text=f"Terbaca: {fmt_idr(val)}")
+
     def _build_filter_panel(self, parent):
         fr = ttk.LabelFrame(parent, text="Filter & Pencarian", padding=10); fr.pack(fill=tk.X, pady=(0,10))
         label_style = {"font": FONT_BOLD}
@@ -591,14 +1098,49 @@ class MoneyManagerPro(tb.Window):
         self.summary_label = ttk.Label(summary, text="Total: 0 | Pemasukan: Rp0 IDR | Pengeluaran: Rp0 IDR | Saldo: Rp0 IDR", font=FONT_BOLD); self.summary_label.pack(side=tk.LEFT)
 
     def _build_charts(self, parent):
+        plt, FigureCanvasTkAgg = _pyplot()
         chart = ttk.Frame(parent); chart.pack(fill=tk.BOTH, expand=True, pady=(10,0))
         plt.rcParams.update({'font.size': 10, 'font.weight': 'bold','axes.titlesize': 12, 'axes.titleweight': 'bold', 'axes.labelweight': 'bold'})
         bal_frame = ttk.LabelFrame(chart, text="Grafik Saldo (Prediksi 7 hari)", padding=10); bal_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0,5))
-        self.fig_balance, self.ax_balance = plt.subplots(figsize=(8,3), dpi=100); self.balance_embed = FigureCanvasTkAgg(self.fig_balance, master=bal_frame); self.balance_embed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.fig_balance, self.ax_balance = plt.subplots(figsize=(8,3), dpi=100, constrained_layout=True); self.balance_embed = FigureCanvasTkAgg(self.fig_balance, master=bal_frame); self.balance_embed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         type_frame = ttk.LabelFrame(chart, text="Distribusi Transaksi", padding=10); type_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5,5))
-        self.fig_type, self.ax_type = plt.subplots(figsize=(4,3), dpi=100); self.type_embed = FigureCanvasTkAgg(self.fig_type, master=type_frame); self.type_embed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.fig_type, self.ax_type = plt.subplots(figsize=(4,3), dpi=100, constrained_layout=True); self.type_embed = FigureCanvasTkAgg(self.fig_type, master=type_frame); self.type_embed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         month_frame = ttk.LabelFrame(chart, text="Perbandingan Bulanan (Income vs Expense)", padding=10); month_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5,0))
-        self.fig_month, self.ax_month = plt.subplots(figsize=(6,3), dpi=100); self.month_embed = FigureCanvasTkAgg(self.fig_month, master=month_frame); self.month_embed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.fig_month, self.ax_month = plt.subplots(figsize=(6,3), dpi=100, constrained_layout=True); self.month_embed = FigureCanvasTkAgg(self.fig_month, master=month_frame); self.month_embed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self._init_chart_artists()
+
+    def _no_data_text(self, ax):
+        return ax.text(0.5,0.5,'No data',ha='center',va='center',transform=ax.transAxes, fontweight='bold', visible=False)
+
+    def _init_chart_artists(self):
+        # persistent artists; update_charts only swaps their data
+        ax = self.ax_balance
+        ax.xaxis_date()
+        self._ln_balance, = ax.plot([], [], marker='o', linestyle='-', label='Total', linewidth=2)
+        self._ln_pred, = ax.plot([], [], linestyle='--', label='Prediksi 7 hari', linewidth=2)
+        ax.set_title('Perkembangan Saldo', fontweight='bold')
+        ax.set_xlabel('Tanggal', fontweight='bold')
+        ax.set_ylabel('Saldo (IDR)', fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+        ax.tick_params(axis='x', labelrotation=45)
+        for lab in ax.get_xticklabels():
+            lab.set_ha('right')
+        self._txt_balance = self._no_data_text(ax)
+
+        self._pie_key = None
+        self._txt_type = self._no_data_text(self.ax_type)
+
+        ax = self.ax_month
+        ax.set_title('Income vs Expense per Bulan', fontweight='bold')
+        ax.set_ylabel('IDR', fontweight='bold')
+        ax.grid(True, axis='y', alpha=0.3)
+        self._bars_month = None  # (income BarContainer, expense BarContainer)
+        self._monthly_src = None  # the self.data frame the bars were built from
+        # bumped whenever a chart's artists change; _render_charts_to_images caches PNGs per version
+        self._chart_version = {"balance": 0, "type": 0, "month": 0}
+        self._png_cache = {}
+        self._txt_month = self._no_data_text(ax)
 
     def _build_user_summary(self, parent):
         top = ttk.Frame(parent); top.pack(fill=tk.X, pady=8, padx=8)
@@ -633,6 +1175,11 @@ class MoneyManagerPro(tb.Window):
         self.style.theme_use('darkly' if theme != 'darkly' else 'litera')
 
     def connect_to_gsheets(self):
+        snap = self.backup.load_snapshot()
+        if snap is not None and not snap.empty:
+            self._show_data(snap)
+            self.update_status("Snapshot lokal, menyinkronkan...")
+
         def t():
             if self.gsheets.connect() and self.gsheets.open_sheet():
                 self.load_data()
@@ -644,77 +1191,212 @@ class MoneyManagerPro(tb.Window):
         threading.Thread(target=t, daemon=True).start()
 
     def load_data(self):
-        df = self.gsheets.get_all_data()
-        self._last_sheet_checksum = self.gsheets.last_checksum
-        self.data = df.copy() if not df.empty else pd.DataFrame(columns=HEADERS)
-        self.filtered_data = self.data.copy()
+        """Fetch the sheet on a worker thread; the Tk thread only applies the result."""
+        if self._loading:
+            self._reload_pending = True  # coalesce: one more fetch once this one lands
+            return
+        self._loading = True
+
+        def work():
+            try:
+                df = self.gsheets.get_all_data()
+            except Exception as e:
+                print("Load error:", e)
+                df = pd.DataFrame(columns=HEADERS)
+            if not df.empty:
+                self.backup.save_snapshot(df)
+            cs, rev = self.gsheets.last_checksum, self.gsheets.last_revision
+            self.after(0, lambda: self._apply_loaded_data(df, cs, rev))
+        threading.Thread(target=work, daemon=True).start()
+
+    def _apply_loaded_data(self, df, checksum, revision):
+        self._loading = False
+        self._last_sheet_checksum = checksum
+        self._last_revision = revision
+        self._show_data(df)
+        self._backup_async(self.data)
+        self.update_status("Data loaded")
+        threading.Thread(target=self.check_parity_against_api, kwargs={"silent": True}, daemon=True).start()
+        if self._reload_pending:
+            self._reload_pending = False
+            self.load_data()
+
+    def _backup_async(self, df):
+        """Timestamped backup on a worker thread, at most once per backup_min_interval."""
+        now = time.monotonic()
+        if now - self._last_backup_t < CONFIG['backup_min_interval']:
+            return
+        self._last_backup_t = now
+        self._queue_backup(df, self._data_version)
+
+    def _queue_backup(self, df, version):
+        # at most one write in flight and one queued: bursts coalesce into the newest snapshot
+        try: self._bk_q.get_nowait()
+        except queue.Empty: pass
+        try: self._bk_q.put_nowait((df, version))
+        except queue.Full: pass  # another producer got in first; its snapshot is just as fresh
+
+    def _bk_writer(self):
+        fails = 0  # failed backups back off exponentially
+        while True:
+            item = self._bk_q.get()
+            if item is None or self._stop.is_set():
+                break  # a tick racing _on_close may have replaced the sentinel with a snapshot
+            df, version = item
+            # create_backup logs and returns False on OSError/pickling errors
+            if self.backup.create_backup(df):
+                self._last_saved_version = version
+                fails = 0
+            else:
+                fails += 1
+                self._bk_retry_at = time.monotonic() + min(CONFIG['auto_save_interval'] * 2 ** fails, CONFIG['backup_backoff_max'])
+
+    def _show_data(self, df):
+        # positional index: _display_rows[i] is the row labelled i
+        self.data = df.reset_index(drop=True) if not df.empty else pd.DataFrame(columns=HEADERS)
+        self._rebuild_data_caches()
+        # filters only read; filtered_data may share self.data until a filter narrows it
+        self.filtered_data = self.data
         self.refresh_table()
         self.update_summary()
         self.update_charts()
         self.refresh_user_summary()
-        self.backup.create_backup(self.data)
         self.update_bank_badges()
-        self.update_status("Data loaded")
-        self.check_parity_against_api(silent=True)
 
     # ---------- realtime watcher ----------
     def start_realtime_sync(self):
         def watcher():
-            while True:
+            while not self._stop.is_set():
                 try:
-                    time.sleep(CONFIG['auto_refresh_seconds'])
+                    # with a push channel we wake on POST, and poll only as a safety net
+                    if self.gsheets.ensure_push_channel():
+                        self.gsheets.changed.wait(CONFIG['safety_poll_seconds'])
+                    else:
+                        self.gsheets.changed.wait(CONFIG['auto_refresh_seconds'])
+                    self.gsheets.changed.clear()
+                    if self._stop.is_set():
+                        break
+                    if self.gsheets.drive_service is not None and not CONFIG['checksum_polling']:
+                        # cheap metadata poll; the full sheet is fetched only on a new revision
+                        rev = self.gsheets._get_revision()
+                        if rev and rev != self._last_revision:
+                            self._last_revision = rev
+                            self.after(0, self._schedule_tail_sync)
+                        continue
                     cs = self.gsheets.get_sheet_checksum()
                     if cs and cs != self._last_sheet_checksum:
                         self._last_sheet_checksum = cs
                         # reload on UI thread
-                        self.after(0, self.load_data)
+                        self.after(0, self._schedule_tail_sync)
                 except Exception:
                     pass
         threading.Thread(target=watcher, daemon=True).start()
 
-    # ---------- Filters & Table ----------
-    def _format_row_for_display(self, row_dict: dict):
-        display_vals = []
-        for col in HEADERS:
-            v = row_dict.get(col, "")
-            if col in MONEY_COLS:
-                try:
-                    display_vals.append(fmt_idr(float(v)))
-                except Exception:
-                    display_vals.append(fmt_idr(0))
-            else:
-                display_vals.append(v)
-        return display_vals
+    def _schedule_tail_sync(self):
+        # a burst of edits fires several notifications; only the last one within the window fetches
+        if self._tail_after_id:
+            self.after_cancel(self._tail_after_id)
+        self._tail_after_id = self.after(CONFIG['sync_debounce_ms'], self._sync_tail)
 
-    def _get_anomaly_mask(self, df):
-        if df.empty:
-            return pd.Series([], dtype=bool)
-        amt = np.maximum(df['Credit'].astype(float).values, df['Debit'].astype(float).values)
-        s = pd.Series(amt)
-        mean = s.mean()
-        std = s.std(ddof=0)
-        if std == 0:
-            return pd.Series([False]*len(df))
-        thresh = mean + CONFIG['anomaly_std_multiplier']*std
-        return s > thresh
+    def _sync_tail(self):
+        """
+        Append-only fast path. The whole sheet is still fetched (get_tail checks the known rows
+        against their checksum), but only the new rows are parsed and formatted, and the table
+        keeps its page. Anything other than a pure append falls back to load_data.
+        """
+        self._tail_after_id = None
+        if self._loading or self.data.empty:
+            self.load_data()
+            return
+        if self._tail_syncing:
+            self._schedule_tail_sync()
+            return
+        self._tail_syncing = True
+        base = self.data
+
+        def work():
+            df = None
+            try:
+                tail = self.gsheets.get_tail() if len(base) == self.gsheets.row_count else None
+                if tail is not None and not tail.empty:
+                    tgl = pd.to_datetime(tail["Tanggal"], format=CONFIG['date_format'], errors='coerce', cache=True)
+                    # balances/anomaly are cheap vectorized passes; Tanggal is parsed for the new rows only
+                    df = recompute_all_balances(pd.concat([base[HEADERS], tail[HEADERS]], ignore_index=True))[HEADERS].copy()
+                    df["No."] = np.arange(1, len(df)+1, dtype=np.int32)
+                    df["_is_anomaly"] = compute_anomaly_mask(df)
+                    df["_tgl"] = pd.concat([base["_tgl"], tgl], ignore_index=True)
+                    df = _categorize(df)
+                    self.backup.save_snapshot(df)
+            except Exception as e:
+                print("Tail sync error:", e)
+                df = None
+            self.after(0, lambda: self._apply_tail(base, df))
+        threading.Thread(target=work, daemon=True).start()
+
+    def _apply_tail(self, base, df):
+        self._tail_syncing = False
+        if df is None or self.data is not base:
+            self.load_data()
+            return
+        start = len(base)
+        self.data = df
+        self._extend_data_caches(start)
+        self.apply_filters(keep_page=True, quiet=True)  # a realtime append must not move the page or pop dialogs
+        self.refresh_user_summary()
+        self.update_status("Data loaded")
+
+    # ---------- Filters & Table ----------
+    def _rebuild_data_caches(self):
+        """Derived per-data state; call whenever self.data is replaced."""
+        self._data_version += 1
+        fmt = self.data.copy()
+        if not fmt.empty:
+            fmt[MONEY_COLS] = fmt[MONEY_COLS].apply(fmt_idr_series)
+        self._fmt_cache = fmt
+        self._display_rows = fmt[HEADERS].to_numpy().tolist()
+        self._rebuild_filter_index()
+
+    def _extend_data_caches(self, start):
+        """After an append-only update: format rows start.. only, earlier rows are unchanged."""
+        self._data_version += 1
+        tail = self.data.iloc[start:].copy()
+        tail[MONEY_COLS] = tail[MONEY_COLS].apply(fmt_idr_series)
+        self._fmt_cache = pd.concat([self._fmt_cache, tail])
+        self._display_rows.extend(tail[HEADERS].to_numpy().tolist())
+        self._rebuild_filter_index()
+
+    def _rebuild_filter_index(self):
+        """
+        Everything apply_filters tests, as flat arrays aligned with self.data. User and bank
+        are matched on their categories (a few dozen strings) and broadcast through the codes.
+        """
+        d = self.data
+        if d.empty:
+            self._fidx = None
+            return
+        user = d["User ID"] if isinstance(d["User ID"].dtype, pd.CategoricalDtype) else d["User ID"].astype("category")
+        bank = d["Bank/EWallet"] if isinstance(d["Bank/EWallet"].dtype, pd.CategoricalDtype) else d["Bank/EWallet"].astype("category")
+        self._fidx = {
+            "user_codes": user.cat.codes.to_numpy(),
+            "user_lower": pd.Series(user.cat.categories.astype(str)).str.lower(),
+            "bank_codes": bank.cat.codes.to_numpy(),
+            "bank_cats": bank.cat.categories,
+            "credit": d["Credit"].to_numpy() > 0,
+            "debit": d["Debit"].to_numpy() > 0,
+            "tgl": d["_tgl"].to_numpy(),
+            "anomaly": d["_is_anomaly"].to_numpy(dtype=bool),
+        }
 
     def refresh_table(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+        self.tree.delete(*self.tree.get_children())  # one Tcl call for the whole page
         start = self.current_page * self.rows_per_page
         page = self.filtered_data.iloc[start:start+self.rows_per_page] if not self.filtered_data.empty else pd.DataFrame(columns=HEADERS)
-        anomaly_mask_page = self._get_anomaly_mask(page) if not page.empty else pd.Series([], dtype=bool)
-        for idx, row in page.iterrows():
-            row_dict = {c: row.get(c, "") for c in HEADERS}
-            vals = self._format_row_for_display(row_dict)
-            tag = ""
-            if float(row.get("Credit",0))>0:
-                tag = "income"
-            elif float(row.get("Debit",0))>0:
-                tag = "expense"
-            if not page.empty and len(anomaly_mask_page)>0:
-                if anomaly_mask_page.iloc[list(page.index).index(idx)]:
-                    tag = "anomaly"
+        page_fmt = [self._display_rows[i] for i in page.index]
+        tags = np.where(page["Credit"].to_numpy(dtype=float) > 0, "income",
+                        np.where(page["Debit"].to_numpy(dtype=float) > 0, "expense", ""))
+        if "_is_anomaly" in page:
+            tags[page["_is_anomaly"].to_numpy(dtype=bool)] = "anomaly"
+        for vals, tag in zip(page_fmt, tags.tolist()):
             self.tree.insert("", "end", values=vals, tags=(tag,))
         total_pages = max(1, math.ceil(len(self.filtered_data)/self.rows_per_page))
         self.page_label.config(text=f"Halaman {self.current_page+1}/{total_pages}")
@@ -729,36 +1411,43 @@ class MoneyManagerPro(tb.Window):
         if (self.current_page+1)*self.rows_per_page < len(self.filtered_data):
             self.current_page+=1; self.refresh_table()
 
-    def apply_filters(self):
+    def apply_filters(self, keep_page=False, quiet=False):
         try:
-            f = self.data.copy()
-            u = self.user_filter.get().strip().lower()
-            if u:
-                f = f[f['User ID'].astype(str).str.lower().str.contains(u)]
-            b = self.bank_filter.get()
-            if b and b!="Semua":
-                f = f[f['Bank/EWallet']==b]
-            t = self.type_filter.get()
-            if t=="Pemasukan":
-                f = f[f['Credit']>0]
-            elif t=="Pengeluaran":
-                f = f[f['Debit']>0]
-            dfm = self.date_from.get().strip(); dt = self.date_to.get().strip()
-            if dfm or dt:
-                f['_tgl'] = pd.to_datetime(f['Tanggal'], format=CONFIG['date_format'], errors='coerce')
+            fi = self._fidx
+            f = self.data
+            if fi is not None:
+                mask = np.ones(len(f), dtype=bool)
+                u = self.user_filter.get().strip().lower()
+                if u:
+                    # code -1 (missing) indexes the trailing False
+                    mask &= np.append(fi["user_lower"].str.contains(u).to_numpy(dtype=bool), False)[fi["user_codes"]]
+                b = self.bank_filter.get()
+                if b and b!="Semua":
+                    code = fi["bank_cats"].get_indexer([b])[0]
+                    mask &= (fi["bank_codes"] == code) if code >= 0 else False
+                t = self.type_filter.get()
+                if t=="Pemasukan":
+                    mask &= fi["credit"]
+                elif t=="Pengeluaran":
+                    mask &= fi["debit"]
+                dfm = self.date_from.get().strip(); dt = self.date_to.get().strip()
                 if dfm:
-                    f = f[f['_tgl'] >= datetime.strptime(dfm, '%d/%m/%Y')]
+                    mask &= fi["tgl"] >= np.datetime64(datetime.strptime(dfm, '%d/%m/%Y'))
                 if dt:
-                    f = f[f['_tgl'] < (datetime.strptime(dt, '%d/%m/%Y') + timedelta(days=1))]
-                f.drop(columns=['_tgl'], inplace=True, errors="ignore")
-            if self.only_anomaly_var.get() and not f.empty:
-                mask = self._get_anomaly_mask(f)
-                f = f[mask]
+                    mask &= fi["tgl"] < np.datetime64(datetime.strptime(dt, '%d/%m/%Y') + timedelta(days=1))
+                if self.only_anomaly_var.get():
+                    mask &= fi["anomaly"]
+                if not mask.all():
+                    f = f[mask]
             self.filtered_data = f
-            self.current_page=0
+            if not keep_page:
+                self.current_page=0
             self.refresh_table(); self.update_summary(); self.update_charts()
         except Exception as e:
-            messagebox.showerror("Error", f"Gagal filter: {e}")
+            if quiet:
+                self.update_status(f"Gagal filter: {e}")
+            else:
+                messagebox.showerror("Error", f"Gagal filter: {e}")
 
     def reset_filters(self):
         self.user_filter.delete(0, tk.END)
@@ -767,7 +1456,7 @@ class MoneyManagerPro(tb.Window):
         self.date_from.delete(0, tk.END)
         self.date_to.delete(0, tk.END)
         self.only_anomaly_var.set(False)
-        self.filtered_data = self.data.copy()
+        self.filtered_data = self.data
         self.current_page = 0
         self.refresh_table(); self.update_summary(); self.update_charts()
 
@@ -804,11 +1493,10 @@ class MoneyManagerPro(tb.Window):
             self.card_today.config(text="Transaksi Hari Ini\n0")
             self.update_bank_badges()
             return
-        income = float(self.filtered_data['Credit'].sum())
-        expense = float(self.filtered_data['Debit'].sum())
-        balance = float(self.filtered_data['Saldo Akhir'].iloc[-1]) if not self.filtered_data.empty else 0.0
-        today = datetime.now().strftime("%d/%m/%Y")
-        trx_today = (pd.to_datetime(self.filtered_data['Tanggal'], format=CONFIG['date_format'], errors='coerce').dt.strftime("%d/%m/%Y").eq(today)).sum()
+        # one reduction over the Credit/Debit block instead of a pass per column
+        income, expense = (float(v) for v in self.filtered_data[['Credit', 'Debit']].to_numpy().sum(axis=0))
+        balance = float(self.filtered_data['Saldo Akhir'].iat[-1])
+        trx_today = int((self.filtered_data['_tgl'].to_numpy().astype('datetime64[D]') == np.datetime64(datetime.now().date())).sum())
         self.summary_label.config(text=f"Total: {len(self.filtered_data)} | Pemasukan: {fmt_idr(income)} | Pengeluaran: {fmt_idr(expense)} | Saldo: {fmt_idr(balance)}")
         self.card_income.config(text=f"Pemasukan\n{fmt_idr(income)}")
         self.card_expense.config(text=f"Pengeluaran\n{fmt_idr(expense)}")
@@ -820,97 +1508,130 @@ class MoneyManagerPro(tb.Window):
         if self.data.empty:
             self.bank_badges.config(text="")
             return
-        last = self.data.iloc[-1]
-        chips = []
-        for b in BANK_LIST:
-            try:
-                v = float(last[b])
-            except Exception:
-                v = 0.0
-            low = v < CONFIG['min_balance_thresholds'].get(b, 0)
-            chip = f"{b}: {int(v):,}".replace(",", ".")
-            chips.append(("❗ " + chip) if low else chip)
+        vals = np.nan_to_num(_last_row_values(self.data, BANK_LIST))
+        th = np.array([CONFIG['min_balance_thresholds'].get(b, 0) for b in BANK_LIST], dtype=np.float64)
+        chips = [f"{b}: {v:,}".replace(",", ".") for b, v in zip(BANK_LIST, vals.astype(np.int64).tolist())]
+        chips = [("❗ " + c) if low else c for c, low in zip(chips, (vals < th).tolist())]
         self.bank_badges.config(text=" | ".join(chips))
 
     def _forecast(self, balances):
         n = len(balances)
         if n < 2:
             return np.array([])
-        x = np.arange(n); y = np.array(balances, dtype=float)
-        a, b = np.polyfit(x, y, 1)
-        xf = np.arange(n, n+7)
-        return a*xf + b
+        return _linfit_forecast(np.asarray(balances, dtype=np.float64), 7)
+
+    def _on_charts_visible(self, _evt=None):
+        if self._charts_stale:
+            self.update_charts()
 
-    def update_charts(self):
-        self.ax_balance.clear()
+    def update_charts(self, force=False):
+        # the charts sit on the Transaksi tab; while it is hidden just remember to redraw on <Map>
+        if not force and not self.tab_transaksi.winfo_ismapped():
+            self._charts_stale = True
+            return
+        self._charts_stale = False
+        self._update_balance_chart()
+        self._update_type_chart()
+        self._update_month_chart()
+
+    def _update_balance_chart(self):
+        ax = self.ax_balance
+        has_data = False
         if not self.filtered_data.empty:
             try:
-                d = pd.to_datetime(self.filtered_data['Tanggal'], format=CONFIG['date_format'], errors='coerce')
+                d = self.filtered_data['_tgl']
                 bal = self.filtered_data['Saldo Akhir'].astype(float).to_numpy()
-                self.ax_balance.plot(d, bal, marker='o', linestyle='-', label='Total', linewidth=2)
+                self._ln_balance.set_data(d, bal)
                 pred = self._forecast(bal)
                 if pred.size>0:
-                    last = pd.to_datetime(self.filtered_data['Tanggal'].iloc[-1], format=CONFIG['date_format'], errors='coerce')
-                    future = [last + timedelta(days=i+1) for i in range(len(pred))]
-                    self.ax_balance.plot(future, pred, linestyle='--', label='Prediksi 7 hari', linewidth=2)
-                self.ax_balance.set_title('Perkembangan Saldo', fontweight='bold')
-                self.ax_balance.set_xlabel('Tanggal', fontweight='bold')
-                self.ax_balance.set_ylabel('Saldo (IDR)', fontweight='bold')
-                self.ax_balance.grid(True, alpha=0.3)
-                self.ax_balance.legend()
-                for lab in self.ax_balance.get_xticklabels():
-                    lab.set_rotation(45); lab.set_ha('right')
+                    last = d.iloc[-1]
+                    self._ln_pred.set_data([last + timedelta(days=i+1) for i in range(len(pred))], pred)
+                else:
+                    self._ln_pred.set_data([], [])
+                has_data = True
             except Exception as e:
                 print("Chart error:", e)
-                self.ax_balance.text(0.5,0.5,'No data',ha='center',va='center',transform=self.ax_balance.transAxes, fontweight='bold')
-        else:
-            self.ax_balance.text(0.5,0.5,'No data',ha='center',va='center',transform=self.ax_balance.transAxes, fontweight='bold')
-        self.fig_balance.tight_layout(); self.balance_embed.draw()
-
-        self.ax_type.clear()
+        if not has_data:
+            self._ln_balance.set_data([], []); self._ln_pred.set_data([], [])
+        self._txt_balance.set_visible(not has_data)
+        ax.relim(); ax.autoscale_view()
+        self._chart_version["balance"] += 1
+        self.balance_embed.draw_idle()
+
+    def _update_type_chart(self):
+        inc = exp = 0
         if not self.filtered_data.empty:
             inc = int((self.filtered_data['Credit']>0).sum())
             exp = int((self.filtered_data['Debit']>0).sum())
-            if inc or exp:
-                self.ax_type.pie([inc,exp], labels=['Pemasukan','Pengeluaran'], autopct='%1.1f%%', startangle=90, textprops={'fontweight': 'bold'})
-                self.ax_type.set_title('Distribusi Transaksi', fontweight='bold')
-            else:
-                self.ax_type.text(0.5,0.5,'No data',ha='center',va='center',transform=self.ax_type.transAxes, fontweight='bold')
+        key = (inc, exp)
+        if key == self._pie_key:
+            return
+        self._pie_key = key
+        # wedges cannot be re-proportioned in place; redraw only when the counts change
+        ax = self.ax_type
+        ax.clear()
+        if inc or exp:
+            ax.pie([inc,exp], labels=['Pemasukan','Pengeluaran'], autopct='%1.1f%%', startangle=90, textprops={'fontweight': 'bold'})
+            ax.set_title('Distribusi Transaksi', fontweight='bold')
         else:
-            self.ax_type.text(0.5,0.5,'No data',ha='center',va='center',transform=self.ax_type.transAxes, fontweight='bold')
-        self.fig_type.tight_layout(); self.type_embed.draw()
-
-        self.ax_month.clear()
+            ax.set_axis_off()
+        self._txt_type = self._no_data_text(ax)
+        self._txt_type.set_visible(not (inc or exp))
+        self._chart_version["type"] += 1
+        self.type_embed.draw_idle()
+
+    def _update_month_chart(self):
+        # the monthly chart uses self.data, not filtered_data: filter changes never alter it
+        if self.data is self._monthly_src:
+            return
+        self._monthly_src = self.data
+        ax = self.ax_month
+        g = None
         if not self.data.empty:
             try:
-                tmp = self.data.copy()
-                tmp['_tgl'] = pd.to_datetime(tmp['Tanggal'], format=CONFIG['date_format'], errors='coerce')
-                tmp['YM'] = tmp['_tgl'].dt.to_period('M').astype(str)
-                g = tmp.groupby('YM').agg(Income=('Credit','sum'), Expense=('Debit','sum')).reset_index()
-                x = np.arange(len(g)); width = 0.35
-                self.ax_month.bar(x - width/2, g['Income'].values, width, label='Income')
-                self.ax_month.bar(x + width/2, g['Expense'].values, width, label='Expense')
-                self.ax_month.set_xticks(x); self.ax_month.set_xticklabels(g['YM'].tolist(), rotation=45, ha='right')
-                self.ax_month.set_title('Income vs Expense per Bulan', fontweight='bold')
-                self.ax_month.set_ylabel('IDR', fontweight='bold')
-                self.ax_month.grid(True, axis='y', alpha=0.3)
-                self.ax_month.legend()
+                ym = self.data['_tgl'].dt.to_period('M').astype(str).rename('YM')
+                g = self.data.groupby(ym).agg(Income=('Credit','sum'), Expense=('Debit','sum')).reset_index()
             except Exception as e:
                 print("Monthly chart error:", e)
-                self.ax_month.text(0.5,0.5,'No data',ha='center',va='center',transform=self.ax_month.transAxes, fontweight='bold')
+        n = 0 if g is None else len(g)
+        if self._bars_month is not None and len(self._bars_month[0]) != n:
+            for c in self._bars_month:
+                c.remove()
+            self._bars_month = None
+            if ax.get_legend() is not None:
+                ax.get_legend().remove()
+        if n:
+            x = np.arange(n); width = 0.35
+            if self._bars_month is None:
+                self._bars_month = (ax.bar(x - width/2, g['Income'].values, width, label='Income', color='C0'),
+                                    ax.bar(x + width/2, g['Expense'].values, width, label='Expense', color='C1'))
+                ax.legend()
+            else:
+                for c, col in zip(self._bars_month, ('Income', 'Expense')):
+                    for patch, h in zip(c.patches, g[col].values):
+                        patch.set_height(h)
+            ax.set_xticks(x); ax.set_xticklabels(g['YM'].tolist(), rotation=45, ha='right')
         else:
-            self.ax_month.text(0.5,0.5,'No data',ha='center',va='center',transform=self.ax_month.transAxes, fontweight='bold')
-        self.fig_month.tight_layout(); self.month_embed.draw()
+            ax.set_xticks([])
+        self._txt_month.set_visible(not n)
+        ax.relim(); ax.autoscale_view()
+        self._chart_version["month"] += 1
+        self.month_embed.draw_idle()
 
     def refresh_user_summary(self):
-        for it in self.tree_user.get_children():
-            self.tree_user.delete(it)
+        self.tree_user.delete(*self.tree_user.get_children())
         if self.data.empty:
             return
-        g = self.data.groupby("User ID", dropna=False).agg(Total_Pemasukan=("Credit","sum"), Total_Pengeluaran=("Debit","sum")).reset_index()
+        g = self.data.groupby("User ID", dropna=False, observed=True).agg(Total_Pemasukan=("Credit","sum"), Total_Pengeluaran=("Debit","sum")).reset_index()
         g["Saldo_Net"] = g["Total_Pemasukan"] - g["Total_Pengeluaran"]
-        for _, r in g.iterrows():
-            self.tree_user.insert("", "end", values=[r["User ID"], fmt_idr(r["Total_Pemasukan"]), fmt_idr(r["Total_Pengeluaran"]), fmt_idr(r["Saldo_Net"])])
+        disp = pd.DataFrame({
+            "uid": g["User ID"],
+            "i": fmt_idr_series(g["Total_Pemasukan"]),
+            "o": fmt_idr_series(g["Total_Pengeluaran"]),
+            "n": fmt_idr_series(g["Saldo_Net"]),
+        })
+        for row in disp.itertuples(index=False, name=None):
+            self.tree_user.insert("", "end", values=row)
 
     def refresh_audit_view(self):
         self.audit_text.delete("1.0", tk.END)
@@ -919,44 +1640,30 @@ class MoneyManagerPro(tb.Window):
 
     # ---------- Parity Check ----------
     def check_parity_against_api(self, silent=False):
+        """Fetch and compare on the calling (worker) thread; Tk state is only touched via after(). False on API errors."""
+        state, details, dialog, ok = self._parity_result(self.data)
+        self.after(0, lambda: self._show_parity(state, details, None if silent else dialog))
+        return ok
+
+    def _parity_result(self, data):
+        """(state, details or None to keep the last ones, (messagebox fn, title, text), ok); no Tk calls."""
         try:
             vals = self.gsheets._get_all_values_unformatted()
             if not vals or len(vals) < 2:
-                self.parity_state.set("Unknown")
-                if not silent: messagebox.showwarning("Parity", "Sheet kosong / tidak terbaca")
-                self.update_status(); return
-            header = vals[0]; rows = vals[1:]
-            idx = {h: i for i, h in enumerate(header)}
-            df_raw = []
-            for r in rows:
-                item = {}
-                for h in HEADERS:
-                    if h in idx and idx[h] < len(r):
-                        v = r[idx[h]]
-                    elif h in BANK_LIST and f"Saldo Akhir {h}" in idx and idx[f"Saldo Akhir {h}"] < len(r):
-                        v = r[idx[f"Saldo Akhir {h}"]]
-                    else:
-                        v = ""
-                    item[h] = parse_amount_idr(v) if h in MONEY_COLS else v
-                try:
-                    item["No."] = int(item.get("No.", 0) or 0)
-                except:
-                    item["No."] = 0
-                df_raw.append(item)
-            df_raw = pd.DataFrame(df_raw, columns=HEADERS)
+                return "Unknown", None, ("showwarning", "Parity", "Sheet kosong / tidak terbaca"), True
+            # same column-wise normalization as get_all_data, no per-cell loop
+            df_raw = self.gsheets._values_to_frame(vals)
             if df_raw.empty:
-                self.parity_state.set("Unknown")
-                if not silent: messagebox.showwarning("Parity", "Data raw kosong")
-                self.update_status(); return
+                return "Unknown", None, ("showwarning", "Parity", "Data raw kosong"), True
             df_raw = recompute_all_balances(df_raw); df_raw = df_raw[HEADERS].copy(); df_raw["No."] = range(1, len(df_raw)+1)
             diffs = []
-            if len(df_raw) != len(self.data):
-                diffs.append(f"Jumlah baris berbeda → API:{len(df_raw)} vs Dashboard:{len(self.data)}")
-            if not df_raw.empty and not self.data.empty:
-                last_api = df_raw.iloc[-1]; last_ui = self.data.iloc[-1]
-                if abs(float(df_raw["Credit"].sum()) - float(self.data["Credit"].sum())) > 1e-6:
+            if len(df_raw) != len(data):
+                diffs.append(f"Jumlah baris berbeda → API:{len(df_raw)} vs Dashboard:{len(data)}")
+            if not df_raw.empty and not data.empty:
+                last_api = df_raw.iloc[-1]; last_ui = data.iloc[-1]
+                if abs(float(df_raw["Credit"].sum()) - float(data["Credit"].sum())) > 1e-6:
                     diffs.append("Total Credit berbeda")
-                if abs(float(df_raw["Debit"].sum()) - float(self.data["Debit"].sum())) > 1e-6:
+                if abs(float(df_raw["Debit"].sum()) - float(data["Debit"].sum())) > 1e-6:
                     diffs.append("Total Debit berbeda")
                 if abs(float(last_api["Saldo Akhir"]) - float(last_ui["Saldo Akhir"])) > 1e-6:
                     diffs.append(f"Saldo Akhir terakhir berbeda ({int(last_api['Saldo Akhir'])} vs {int(last_ui['Saldo Akhir'])})")
@@ -964,16 +1671,19 @@ class MoneyManagerPro(tb.Window):
                     if abs(float(last_api[b]) - float(last_ui[b])) > 1e-6:
                         diffs.append(f"{b} terakhir berbeda ({int(last_api[b])} vs {int(last_ui[b])})")
             if diffs:
-                self.parity_state.set("Drift"); self.parity_details_last = "\n".join(diffs)
-                if not silent: messagebox.showwarning("Parity: DRIFT terdeteksi", self.parity_details_last)
-            else:
-                self.parity_state.set("OK"); self.parity_details_last = "Semua cocok (Dashboard = API)."
-                if not silent: messagebox.showinfo("Parity: OK", "Dashboard sama dengan Google Sheets API.")
+                details = "\n".join(diffs)
+                return "Drift", details, ("showwarning", "Parity: DRIFT terdeteksi", details), True
+            return "OK", "Semua cocok (Dashboard = API).", ("showinfo", "Parity: OK", "Dashboard sama dengan Google Sheets API."), True
         except Exception as e:
-            self.parity_state.set("Unknown"); self.parity_details_last = f"Gagal cek parity: {e}"
-            if not silent: messagebox.showerror("Parity Error", str(e))
-        finally:
-            self.update_status()
+            return "Unknown", f"Gagal cek parity: {e}", ("showerror", "Parity Error", str(e)), False
+
+    def _show_parity(self, state, details, dialog):
+        self.parity_state.set(state)
+        if details is not None:
+            self.parity_details_last = details
+        if dialog:
+            getattr(messagebox, dialog[0])(dialog[1], dialog[2])
+        self.update_status()
 
     # ---------- Transactions ----------
     def save_transaction(self):
@@ -994,27 +1704,56 @@ class MoneyManagerPro(tb.Window):
 
         # Ambil saldo per bank dari baris terakhir UI (hanya untuk kalkulasi kolom bank),
         # tapi kebenaran final tetap diserahkan ke API saat reload.
-        if not self.data.empty:
-            last = self.data.iloc[-1]; per_bank = {b: float(last[b]) for b in BANK_LIST}
-        else:
-            per_bank = {b: 0.0 for b in BANK_LIST}
-        if bank in BANK_LIST:
+        new_no, per_bank = self._next_row_base()
+        if bank in _BANK_SET:
             per_bank[bank] += (credit - debit)
         new_total = sum(per_bank.values())
         now = datetime.now().strftime(CONFIG['date_format'])
-        new_no = int(self.data["No."].iloc[-1]) + 1 if (not self.data.empty and "No." in self.data.columns) else 1
         new_row = [new_no, now, user_id, bank, str(desc), credit, debit, new_total] + [per_bank[b] for b in BANK_LIST]
 
         if self.gsheets.append_data(new_row):
             audit_log("Save Transaction", f"{user_id} {ttype} {amount}")
             self.clear_inputs()
-            # Penting: langsung reload dari API agar state = Google Sheets (realtime, no drift)
-            self.load_data()
+            # Penting: setelah flush, reload dari API agar state = Google Sheets (realtime, no drift)
+            self._schedule_flush()
             messagebox.showinfo("Sukses", "Transaksi disimpan")
         else:
             messagebox.showerror("Error", "Gagal simpan ke Google Sheets")
         self.update_status()
 
+    def _next_row_base(self):
+        """(No. berikutnya, saldo per bank) setelah baris terakhir, termasuk baris yang belum terkirim."""
+        data_no = int(self.data["No."].iat[-1]) if not self.data.empty else 0
+        # rows still queued, being sent, or sent before self.data was reloaded all count
+        pending = self.gsheets.pending_rows(after_no=data_no)
+        if pending:
+            last = pending[-1]
+            first_bank = HEADERS.index(BANK_LIST[0])
+            return int(last[0]) + 1, {b: float(v) for b, v in zip(BANK_LIST, last[first_bank:])}
+        if not self.data.empty:
+            return data_no + 1, dict(zip(BANK_LIST, np.nan_to_num(_last_row_values(self.data, BANK_LIST)).tolist()))
+        return 1, {b: 0.0 for b in BANK_LIST}
+
+    def _schedule_flush(self, delay_ms=None):
+        if self._flush_after_id is None:
+            ms = CONFIG['append_flush_ms'] if delay_ms is None else delay_ms
+            self._flush_after_id = self.after(ms, self._flush_appends)
+
+    def _flush_appends(self):
+        self._flush_after_id = None
+
+        def work():
+            ok = self.gsheets.flush_appends()
+            self.after(0, lambda: self._on_appends_flushed(ok))
+        threading.Thread(target=work, daemon=True).start()
+
+    def _on_appends_flushed(self, ok):
+        if ok:
+            self.load_data()
+            return
+        self._schedule_flush(CONFIG['append_retry_seconds'] * 1000)
+        self.update_status("Gagal sinkron ke Google Sheets, dicoba lagi")
+
     def open_transfer_dialog(self):
         dlg = tb.Toplevel(self); dlg.title("Transfer Antar Bank"); dlg.geometry("420x240")
         label_style = {"font": FONT_BOLD}
@@ -1036,7 +1775,7 @@ class MoneyManagerPro(tb.Window):
                 # buat dua baris transaksi
                 self._append_transaction_row("SYSTEM", s, 0.0, a, note)
                 self._append_transaction_row("SYSTEM", d, a, 0.0, note)
-                self.load_data()  # reload dari API
+                self._schedule_flush()  # satu request untuk kedua baris, lalu reload dari API
                 messagebox.showinfo("Sukses", "Transfer berhasil dicatat")
                 dlg.destroy()
             except Exception as e:
@@ -1045,15 +1784,11 @@ class MoneyManagerPro(tb.Window):
         tb.Button(dlg, text="Proses", bootstyle="success", command=do_transfer, width=14).grid(row=4, column=0, columnspan=2, pady=12)
 
     def _append_transaction_row(self, user_id, bank, credit, debit, desc):
-        if not self.data.empty:
-            last = self.data.iloc[-1]; per_bank = {b: float(last[b]) for b in BANK_LIST}
-        else:
-            per_bank = {b: 0.0 for b in BANK_LIST}
-        if bank in BANK_LIST:
+        new_no, per_bank = self._next_row_base()
+        if bank in _BANK_SET:
             per_bank[bank] += (float(credit) - float(debit))
         new_total = sum(per_bank.values())
         now = datetime.now().strftime(CONFIG['date_format'])
-        new_no = int(self.data["No."].iloc[-1]) + 1 if (not self.data.empty and "No." in self.data.columns) else 1
         row = [new_no, now, user_id, bank, str(desc), float(credit), float(debit), new_total] + [per_bank[b] for b in BANK_LIST]
         if self.gsheets.append_data(row):
             audit_log("Transfer Row", f"{user_id} {bank} +{credit} -{debit}")
@@ -1074,10 +1809,10 @@ class MoneyManagerPro(tb.Window):
                 per_bank = {b: parse_amount_idr(entries[b].get()) for b in BANK_LIST}
                 total = sum(per_bank.values())
                 now = datetime.now().strftime(CONFIG['date_format'])
-                new_no = int(self.data["No."].iloc[-1]) + 1 if (not self.data.empty and "No." in self.data.columns) else 1
+                new_no, _ = self._next_row_base()
                 row = [new_no, now, "SYSTEM", "SALDO AWAL", "Penyesuaian saldo awal", 0, 0, total] + [per_bank[b] for b in BANK_LIST]
                 if self.gsheets.append_data(row):
-                    self.load_data()   # reload dari API
+                    self._schedule_flush()   # reload dari API setelah terkirim
                     messagebox.showinfo("Sukses", "Saldo awal disimpan"); dialog.destroy()
                 else:
                     messagebox.showerror("Error", "Gagal menyimpan saldo awal")
@@ -1097,55 +1832,76 @@ class MoneyManagerPro(tb.Window):
     # ---------- Export ----------
     def _get_relevant_columns(self): return HEADERS
 
+    def _run_export(self, action, path, write, done_msg):
+        """Run write() on a worker thread; dialogs are posted back to the Tk thread."""
+        def work():
+            try:
+                write()
+            except Exception as e:
+                err = str(e)
+                self.after(0, lambda: messagebox.showerror("Error", f"Gagal export: {err}"))
+                return
+            audit_log(action, path)
+            self.after(0, lambda: messagebox.showinfo("Sukses", done_msg))
+        self.update_status(f"Export ke {path}...")
+        threading.Thread(target=work, daemon=True).start()
+
     def export_excel(self):
         if self.filtered_data.empty:
             return messagebox.showinfo("Info","Tidak ada data")
         path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel","*.xlsx")])
         if not path: return
-        try:
-            self.filtered_data[self._get_relevant_columns()].to_excel(path, index=False)
-            audit_log("Export Excel", path); messagebox.showinfo("Sukses", f"Tersimpan ke {path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal export: {e}")
+        df = self.filtered_data[self._get_relevant_columns()]
+        engine = "xlsxwriter" if HAS_XLSXWRITER else None
+        self._run_export("Export Excel", path, lambda: df.to_excel(path, index=False, engine=engine), f"Tersimpan ke {path}")
 
     def export_csv(self):
         if self.filtered_data.empty:
             return messagebox.showinfo("Info","Tidak ada data")
         path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV","*.csv")])
         if not path: return
-        try:
-            self.filtered_data[self._get_relevant_columns()].to_csv(path, index=False, encoding='utf-8-sig')
-            audit_log("Export CSV", path); messagebox.showinfo("Sukses", f"Tersimpan ke {path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal export: {e}")
+        df = self.filtered_data[self._get_relevant_columns()]
+        self._run_export("Export CSV", path, lambda: df.to_csv(path, index=False, encoding='utf-8-sig', chunksize=50000), f"Tersimpan ke {path}")
 
     def _render_charts_to_images(self):
-        buf_bal = io.BytesIO(); self.fig_balance.savefig(buf_bal, format='png', bbox_inches='tight', dpi=160); buf_bal.seek(0)
-        buf_type = io.BytesIO(); self.fig_type.savefig(buf_type, format='png', bbox_inches='tight', dpi=160); buf_type.seek(0)
-        buf_month = io.BytesIO(); self.fig_month.savefig(buf_month, format='png', bbox_inches='tight', dpi=160); buf_month.seek(0)
-        return buf_bal, buf_type, buf_month
+        if self._charts_stale:
+            self.update_charts(force=True)
+        charts = (("balance", self.fig_balance), ("type", self.fig_type), ("month", self.fig_month))
+        for name, fig in charts:
+            # only charts changed since the last export are rendered, one after another: matplotlib
+            # is not thread-safe and Agg drawing holds the GIL anyway
+            ver = self._chart_version[name]
+            if self._png_cache.get(name, (None,))[0] != ver:
+                self._png_cache[name] = (ver, _fig_png(fig))
+        return tuple(io.BytesIO(self._png_cache[name][1]) for name, _ in charts)
 
     def export_pdf(self):
         if self.filtered_data.empty:
             return messagebox.showinfo("Info","Tidak ada data")
         path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF","*.pdf")])
         if not path: return
+        # everything that touches Tk/matplotlib state is gathered here; the worker only builds the PDF
         try:
-            doc = SimpleDocTemplate(path, pagesize=A4, rightMargin=24, leftMargin=24, topMargin=24, bottomMargin=24)
+            income = self.filtered_data['Credit'].sum(); expense = self.filtered_data['Debit'].sum(); balance = self.filtered_data['Saldo Akhir'].iloc[-1]
+            n_rows = len(self.filtered_data)
+            cols = self._get_relevant_columns()
+            # money columns are already formatted in _fmt_cache (same index as self.data)
+            table_rows = self._fmt_cache.loc[self.filtered_data.index, cols].astype(str).values.tolist()
+            bal_png, type_png, month_png = self._render_charts_to_images()
+        except Exception as e:
+            return messagebox.showerror("Error", f"Gagal export: {e}")
+
+        def write():
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Image, Spacer
+            from reportlab.lib.styles import getSampleStyleSheet
+            from reportlab.lib import colors
+            # page streams are flate-compressed too (the table is most of the file); chart PNG bytes come from _png_cache
+            doc = SimpleDocTemplate(path, pagesize=A4, rightMargin=24, leftMargin=24, topMargin=24, bottomMargin=24, pageCompression=1)
             el = []; styles = getSampleStyleSheet()
             el.append(Paragraph("Laporan Transaksi Money Manager Pro", styles['Title']))
             el.append(Paragraph(f"Generated: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", styles['Normal'])); el.append(Spacer(1,10))
-            income = self.filtered_data['Credit'].sum(); expense = self.filtered_data['Debit'].sum(); balance = self.filtered_data['Saldo Akhir'].iloc[-1]
-            el.append(Paragraph(f"<b>Ringkasan:</b><br/>Total Transaksi: {len(self.filtered_data)}<br/>Total Pemasukan: {fmt_idr(income)}<br/>Total Pengeluaran: {fmt_idr(expense)}<br/>Saldo Akhir: {fmt_idr(balance)}", styles['Normal'])); el.append(Spacer(1,8))
-            cols = self._get_relevant_columns(); table_rows = []
-            for _, row in self.filtered_data.iterrows():
-                rd = {c: row.get(c, "") for c in cols}; disp = []
-                for c in cols:
-                    if c in MONEY_COLS:
-                        try: disp.append(fmt_idr(float(rd[c])))
-                        except Exception: disp.append(fmt_idr(0))
-                    else: disp.append(rd[c])
-                table_rows.append(disp)
+            el.append(Paragraph(f"<b>Ringkasan:</b><br/>Total Transaksi: {n_rows}<br/>Total Pemasukan: {fmt_idr(income)}<br/>Total Pengeluaran: {fmt_idr(expense)}<br/>Saldo Akhir: {fmt_idr(balance)}", styles['Normal'])); el.append(Spacer(1,8))
             table_data = [cols] + table_rows
             tbl = Table(table_data, repeatRows=1)
             tbl.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), colors.HexColor("#607D8B")),
@@ -1157,64 +1913,343 @@ class MoneyManagerPro(tb.Window):
                                      ('BACKGROUND', (0,1), (-1,-1), colors.whitesmoke),
                                      ('GRID', (0,0), (-1,-1), 0.25, colors.grey)]))
             el.append(tbl); el.append(Spacer(1,12))
-            bal_png, type_png, month_png = self._render_charts_to_images()
-            el.append(Paragraph("<b>Grafik Saldo</b>", styles['Heading3'])); el.append(Image(bal_png, width=500, height=220)); el.append(Spacer(1,8))
-            el.append(Paragraph("<b>Distribusi Transaksi</b>", styles['Heading3'])); el.append(Image(type_png, width=350, height=220)); el.append(Spacer(1,8))
-            el.append(Paragraph("<b>Perbandingan Bulanan (Income vs Expense)</b>", styles['Heading3'])); el.append(Image(month_png, width=500, height=220))
-            doc.build(el); audit_log("Export PDF", path); messagebox.showinfo("Sukses", f"PDF tersimpan ke {path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal export: {e}")
+            el.append(Paragraph("<b>Grafik Saldo</b>", styles['Heading3'])); el.append(Image(bal_png, width=500, height=220, lazy=2)); el.append(Spacer(1,8))
+            el.append(Paragraph("<b>Distribusi Transaksi</b>", styles['Heading3'])); el.append(Image(type_png, width=350, height=220, lazy=2)); el.append(Spacer(1,8))
+            el.append(Paragraph("<b>Perbandingan Bulanan (Income vs Expense)</b>", styles['Heading3'])); el.append(Image(month_png, width=500, height=220, lazy=2))
+            doc.build(el)
+        self._run_export("Export PDF", path, write, f"PDF tersimpan ke {path}")
 
     # ---------- Background ----------
     def start_background_tasks(self):
         def auto_bak():
-            while True:
+            # fixed monotonic deadlines: the time a backup takes does not push later ticks back
+            next_t = time.monotonic()
+            while not self._stop.wait(max(0.0, next_t - time.monotonic())):
+                # after a suspend, run once and resume the cadence instead of replaying missed ticks
+                next_t = max(next_t + CONFIG['auto_save_interval'], time.monotonic())
                 try:
-                    if not self.data.empty:
-                        self.backup.create_backup(self.data)
-                        self.check_parity_against_api(silent=True)
-                except:
-                    pass
-                time.sleep(CONFIG['auto_save_interval'])
+                    version = self._data_version  # read before the frame, so a race only re-saves
+                    data = self.data
+                    # the tick only hands a snapshot to _bk_writer; CoW makes the reference itself the snapshot
+                    if not data.empty and version != self._last_saved_version and time.monotonic() >= self._bk_retry_at:
+                        self._queue_backup(data, version)
+                except Exception as e:
+                    # anything else is a bug: log it, but keep the thread alive
+                    print("Auto backup error:", e)
+                    audit_log("Auto Backup Error", str(e))
+        def auto_parity():
+            # own timer: a slow or unreachable API never delays the backup ticks
+            delay, fails = CONFIG['parity_interval'], 0
+            while not self._stop.wait(delay):
+                delay = CONFIG['parity_interval']
+                if not self.gsheets.connected or self.data.empty:
+                    continue  # offline: no connect/DNS churn, and fetching would only report Unknown
+                if not self.check_parity_against_api(silent=True):
+                    fails += 1
+                    delay = min(CONFIG['parity_interval'] * 2 ** fails, CONFIG['parity_backoff_max'])
+                else:
+                    fails = 0
+        self._bk_thread = threading.Thread(target=self._bk_writer, daemon=True)
+        self._bk_thread.start()
         threading.Thread(target=auto_bak, daemon=True).start()
+        threading.Thread(target=auto_parity, daemon=True).start()
+
+    def _on_close(self):
+        if self.gsheets.has_unsent():
+            # "Transaksi disimpan" was already shown for these rows; send them before the window goes
+            if self._flush_after_id is not None:
+                self.after_cancel(self._flush_after_id); self._flush_after_id = None
+            self.update_status("Mengirim transaksi yang tertunda...")
+            self.update_idletasks()
+            # one attempt: the exit path must not sit in the retry backoff on the Tk thread
+            if not self.gsheets.flush_appends(attempts=1, lock_timeout=5) and not messagebox.askyesno(
+                    "Keluar", "Sebagian transaksi belum terkirim ke Google Sheets dan akan hilang.\nTetap keluar?"):
+                self._schedule_flush(CONFIG['append_retry_seconds'] * 1000)
+                return
+        self._stop.set()
+        self.gsheets.changed.set()  # wake the realtime watcher so it sees _stop
+        # otherwise Drive keeps posting to the webhook until expiry; bounded, it is an API call
+        stopper = threading.Thread(target=self.gsheets.stop_push_channel, daemon=True)
+        stopper.start(); stopper.join(3)
+        # a queued snapshot is dropped rather than written on the way out; a write already
+        # running gets a bounded join, pickles are renamed into place so a cut one leaves no file
+        try: self._bk_q.get_nowait()
+        except queue.Empty: pass
+        try: self._bk_q.put_nowait(None)
+        except queue.Full: pass
+        if self._bk_thread is not None:
+            self._bk_thread.join(5)
+        flush_audit_log()
+        self.destroy()
 
     # ---------- New helpers ----------
     def check_min_balance(self, df: pd.DataFrame):
         warnings = []
         if df.empty:
             return warnings
-        latest = df.iloc[-1]
-        for b, th in CONFIG['min_balance_thresholds'].items():
-            try:
-                if float(latest[b]) < float(th):
-                    warnings.append(f"{b} rendah: {fmt_idr(latest[b])}")
-            except Exception:
-                continue
+        # missing/non-numeric cells become NaN and never warn
+        vals = _last_row_values(df, _MIN_BAL_COLS)
+        for i in np.flatnonzero(vals < _MIN_BAL_THR):
+            warnings.append(f"{_MIN_BAL_COLS[i]} rendah: {fmt_idr(float(vals[i]))}")
         return warnings
 
 # ============= BACKUP =============
+_BASE_SUFFIX = ".base.feather"    # full frame (Arrow IPC, lz4)
+_DELTA_SUFFIX = ".delta.feather"  # rows appended since the previous base/delta
+_STAMP_SUFFIXES = (_BASE_SUFFIX, _DELTA_SUFFIX, ".pkl", ".pkl.gz", ".parquet")  # every name one stamp can take
+
 class BackupManager:
     def __init__(self):
         ensure_dirs()
+        self._lock = threading.Lock()  # reload backups and auto_bak may overlap
+        self._last = None  # frame of the last base/delta; its first _rows rows are on disk
+        self._rows = 0
+        self._deltas = 0
+        self._gz_busy = threading.Lock()  # held while _compress_old_pickles or migrate_pickles runs
+        if HAS_PARQUET:
+            threading.Thread(target=self.migrate_pickles, daemon=True).start()
     def create_backup(self, data, filename=None):
+        if filename is None and HAS_PARQUET:
+            return self._backup_incremental(data)
         try:
             if filename is None:
                 filename = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pkl"
             path = os.path.join(CONFIG['backup_folder'], filename)
-            with open(path, "wb") as f:
-                pickle.dump(data, f)
+            if filename.endswith(".parquet"):
+                data.to_parquet(path, compression="zstd", engine="pyarrow")
+            elif filename.endswith(".feather"):
+                import pyarrow.feather as feather
+                feather.write_feather(data.reset_index(drop=True), path, compression="lz4")
+            else:
+                self._write_pickle(path, data)
             audit_log("Backup Created", filename)
             self.cleanup_old()
+            if filename.endswith(".pkl") and self._gz_busy.acquire(blocking=False):
+                threading.Thread(target=self._compress_old_pickles, daemon=True).start()
             return True
         except Exception as e:
             print("Backup error:", e)
             audit_log("Backup Failed", str(e))
             return False
+    @staticmethod
+    def _write_pickle(path, data):
+        # written under .tmp and renamed: a write cut short (exit, full disk) never leaves a
+        # truncated backup that load_backup would pick as the newest
+        tmp = path + ".tmp"
+        try:
+            # 1 MiB buffer: the pickler's many small header/column writes become a few large syscalls
+            with open(tmp, "wb", buffering=1 << 20) as f:
+                # protocol 5 pickles numpy blocks as raw buffer frames straight into the file
+                pickle.Pickler(f, protocol=5).dump(data)
+                if hasattr(os, "posix_fadvise"):
+                    # cold backup: push it to disk and drop it from the page cache
+                    f.flush(); os.fdatasync(f.fileno())
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+    def _compress_old_pickles(self):
+        """Gzip every pickle backup but the newest (feather/parquet backups are compressed already)."""
+        try:
+            if hasattr(os, "sched_setscheduler"):
+                try: os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))  # this thread only
+                except OSError: pass
+            folder = CONFIG['backup_folder']
+            with os.scandir(folder) as it:
+                names = sorted(e.name for e in it if e.name.startswith("backup_") and e.name.endswith(".pkl"))
+            for n in names[:-1]:
+                src = os.path.join(folder, n)
+                tmp = src + ".gz.tmp"
+                with open(src, "rb") as fi, gzip.open(tmp, "wb", compresslevel=1) as fo:
+                    shutil.copyfileobj(fi, fo, 1 << 20)
+                os.replace(tmp, src + ".gz")
+                os.remove(src)
+        except Exception as e:
+            print("Compress error:", e)
+        finally:
+            self._gz_busy.release()
+    def _backup_incremental(self, data):
+        """
+        Write only the rows appended since the last backup as a delta; a full base is written
+        first, after backup_compact_every deltas, or when the already-saved rows changed.
+        """
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        with self._lock:
+            try:
+                n = self._rows
+                prev = self._last
+                same_prefix = (prev is not None and len(data) >= n and list(data.columns) == list(prev.columns)
+                               and (data is prev or _same_sheet_rows(data, prev, n)))
+                full = not same_prefix or self._deltas >= CONFIG['backup_compact_every']
+                if not full and len(data) == n:
+                    return True  # nothing appended since the last backup
+                stamp = self._free_stamp()
+                if stamp is None:
+                    return False  # not written, so the caller must not mark this version saved
+                filename = f"backup_{stamp}{_BASE_SUFFIX if full else _DELTA_SUFFIX}"
+                path = os.path.join(CONFIG['backup_folder'], filename)
+                part = data if full else data.iloc[n:]
+                tmp = path + ".tmp"
+                try:
+                    feather.write_feather(part.reset_index(drop=True), tmp, compression="lz4")
+                except (pa.ArrowTypeError, pa.ArrowInvalid) as e:
+                    # a column Arrow cannot type (mixed object values): full pickle instead; the
+                    # feather chain is untouched, so the next delta still starts at _rows
+                    if os.path.exists(tmp): os.remove(tmp)
+                    filename = f"backup_{stamp}.pkl"
+                    self._write_pickle(os.path.join(CONFIG['backup_folder'], filename), data)
+                    audit_log("Backup Created", f"{filename} (pickle: {e})")
+                    return True
+                os.replace(tmp, path)
+                self._last, self._rows = data, len(data)
+                self._deltas = 0 if full else self._deltas + 1
+                audit_log("Backup Created", filename)
+            except Exception as e:
+                print("Backup error:", e)
+                audit_log("Backup Failed", str(e))
+                return False
+        self.cleanup_old()
+        return True
+    @staticmethod
+    def _free_stamp():
+        """
+        Second-resolution name stamp not used by any backup yet. A second backup within the same
+        second gets a _01.._99 suffix instead of waiting: '.' < '_', so it still sorts after the first.
+        """
+        folder = CONFIG['backup_folder']
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        for cand in [stamp] + [f"{stamp}_{i:02d}" for i in range(1, 100)]:
+            if not any(os.path.exists(os.path.join(folder, f"backup_{cand}{sfx}")) for sfx in _STAMP_SUFFIXES):
+                return cand
+        return None
+    def load_backup(self, filename=None):
+        """
+        Restore a backup by name (default: the newest). A delta is read together with its base and the
+        deltas in between; Arrow IPC buffers are handed to pandas without an extra copy.
+        """
+        folder = CONFIG['backup_folder']
+        try:
+            with os.scandir(folder) as it:
+                names = sorted(e.name for e in it if e.name.startswith("backup_") and not e.name.endswith(".tmp"))
+            if filename is None:
+                if not names:
+                    return None
+                filename = names[-1]
+            path = os.path.join(folder, filename)
+            if filename.endswith((".pkl", ".pkl.gz")):
+                with (gzip.open if filename.endswith(".gz") else open)(path, "rb") as f:
+                    return pickle.load(f)
+            if filename.endswith(".parquet"):
+                return pd.read_parquet(path)
+            import pyarrow as pa
+            chain = [filename]
+            if filename.endswith(_DELTA_SUFFIX):
+                older = [n for n in names if n < filename and n.endswith(_BASE_SUFFIX)]
+                if not older:
+                    raise FileNotFoundError(f"base untuk {filename} tidak ditemukan")
+                chain = [n for n in names if older[-1] <= n <= filename and n.endswith((_BASE_SUFFIX, _DELTA_SUFFIX))]
+            tables = []
+            for n in chain:
+                # left open: buffers of uncompressed columns point into the map
+                tables.append(pa.ipc.open_file(pa.memory_map(os.path.join(folder, n))).read_all())
+            table = tables[0] if len(tables) == 1 else pa.concat_tables(tables, promote_options="default")
+            del tables
+            df = table.to_pandas(self_destruct=True, split_blocks=True)
+            del table  # self_destruct: the table is unusable now, its buffers belong to df
+            if "_is_anomaly" in df.columns and len(chain) > 1:
+                # deltas only carry their own rows' flags; derive them for the whole chain again
+                df["_is_anomaly"] = compute_anomaly_mask(df)
+            return _categorize(df)
+        except Exception as e:
+            print("Restore error:", e)
+            audit_log("Backup Restore Failed", str(e))
+            return None
+    def migrate_pickles(self):
+        """One-shot: rewrite old backup_*.pkl(.gz) files as parquet (keeps the same name stem)."""
+        # same lock as _compress_old_pickles: it would gzip and remove a pickle mid-migration
+        with self._gz_busy:
+            self._migrate_pickles()
+    def _migrate_pickles(self):
+        folder = CONFIG['backup_folder']
+        for name in sorted(os.listdir(folder)):
+            if not (name.startswith("backup_") and name.endswith((".pkl", ".pkl.gz"))):
+                continue
+            src = os.path.join(folder, name)
+            try:
+                with (gzip.open if name.endswith(".gz") else open)(src, "rb") as f:
+                    df = pickle.load(f)
+                if not isinstance(df, pd.DataFrame):
+                    continue
+                dst = src[:src.index(".pkl")] + ".parquet"
+                try:
+                    df.to_parquet(dst, compression="zstd", engine="pyarrow")
+                except (TypeError, ValueError):  # ArrowTypeError/ArrowInvalid: not Arrow-typable, keep the pickle
+                    if os.path.exists(dst): os.remove(dst)
+                    continue
+                os.remove(src)
+                audit_log("Backup Migrated", name)
+            except Exception as e:
+                print("Migrate error:", name, e)
+    def _snapshot_path(self):
+        return os.path.join(CONFIG['backup_folder'], CONFIG['snapshot_file'])
+
+    def save_snapshot(self, df):
+        if not HAS_PARQUET:
+            return False
+        path = self._snapshot_path()
+        try:
+            tmp = path + ".tmp"
+            try:
+                df.to_parquet(tmp, compression="zstd", index=False)
+            except (TypeError, ValueError):
+                # ArrowTypeError/ArrowInvalid on a mixed object column: the snapshot is only a
+                # startup cache, so keep the text columns as text rather than skip it
+                df.astype({c: str for c in _TEXT_COLS if c in df.columns and df[c].dtype == object}).to_parquet(tmp, compression="zstd", index=False)
+            os.replace(tmp, path)  # never leave a half-written snapshot behind
+            return True
+        except Exception as e:
+            print("Snapshot error:", e)
+            return False
+
+    def load_snapshot(self):
+        path = self._snapshot_path()
+        if not HAS_PARQUET or not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+            if "_is_anomaly" not in df.columns and not df.empty:
+                df["_is_anomaly"] = compute_anomaly_mask(df)
+            if "_tgl" not in df.columns and not df.empty:
+                df["_tgl"] = pd.to_datetime(df["Tanggal"], format=CONFIG['date_format'], errors='coerce', cache=True)
+            return _categorize(df)
+        except Exception as e:
+            print("Snapshot error:", e)
+            return None
+
     def cleanup_old(self):
         try:
-            files = sorted([f for f in os.listdir(CONFIG['backup_folder']) if f.startswith("backup_")], reverse=True)
-            for f in files[CONFIG['backup_limit']:]:
-                os.remove(os.path.join(CONFIG['backup_folder'], f))
+            folder = CONFIG['backup_folder']
+            with os.scandir(folder) as it:
+                names = [e.name for e in it if e.name.startswith("backup_") and not e.name.endswith(".tmp")]
+            limit = CONFIG['backup_limit']
+            if len(names) <= limit:
+                return
+            # names sort by their timestamp; only the newest `limit` need ordering
+            kept = heapq.nlargest(limit, names) if limit > 0 else []
+            cutoff = min(kept) if kept else None
+            deltas = [n for n in kept if n.endswith(_DELTA_SUFFIX)]
+            if deltas:
+                # every kept delta is only restorable with everything back to its base, even when
+                # a pickle fallback (or its migrated parquet) sits between them
+                oldest = min(deltas)
+                bases = [n for n in names if n < oldest and n.endswith(_BASE_SUFFIX)]
+                if bases:
+                    cutoff = min(cutoff, max(bases))
+            for n in names:
+                if cutoff is None or n < cutoff:
+                    os.remove(os.path.join(folder, n))
         except Exception as e:
             print("Cleanup error:", e)
 
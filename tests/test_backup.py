@@ -0,0 +1,111 @@
+import os
+import threading
+
+import pytest
+
+for mod in ("gspread", "oauth2client", "ttkbootstrap", "pyarrow"):
+    pytest.importorskip(mod)
+
+import pandas as pd  # noqa: E402
+
+import dashboard  # noqa: E402
+
+
+@pytest.fixture
+def backup(tmp_path, monkeypatch):
+    monkeypatch.setitem(dashboard.CONFIG, "backup_folder", str(tmp_path))
+    return dashboard.BackupManager()
+
+
+def _sheet_values(keterangan):
+    row = {h: "" for h in dashboard.HEADERS}
+    row.update({"No.": 1, "Tanggal": "01/01/2024 10:00:00", "User ID": 7, "Bank/EWallet": "BCA",
+                "Keterangan": keterangan, "Credit": 1000, "Debit": 0})
+    return [dashboard.HEADERS, [row[h] for h in dashboard.HEADERS]]
+
+
+def test_numeric_keterangan_backs_up_as_arrow(backup, tmp_path):
+    gs = dashboard.GoogleSheetsManager.__new__(dashboard.GoogleSheetsManager)
+    df = dashboard._categorize(gs._values_to_frame(_sheet_values(12345)))
+    assert df["Keterangan"].iloc[0] == "12345"
+    assert backup.create_backup(df)
+    assert any(n.endswith(dashboard._BASE_SUFFIX) for n in os.listdir(tmp_path))
+    restored = backup.load_backup()
+    assert restored["Keterangan"].tolist() == ["12345"]
+
+
+def test_mixed_object_column_falls_back_to_pickle(backup, tmp_path):
+    df = pd.DataFrame({"Keterangan": ["makan", 12345], "Credit": [1, 2]})
+    assert backup.create_backup(df)
+    names = [n for n in os.listdir(tmp_path) if n.startswith("backup_")]
+    assert len(names) == 1 and names[0].endswith(".pkl")
+    assert backup.load_backup(names[0]).equals(df)
+
+
+def _ledger(banks):
+    df = pd.DataFrame({h: [""] * len(banks) for h in dashboard.HEADERS})
+    df["No."] = range(1, len(banks) + 1)
+    df["User ID"] = "u1"
+    df["Bank/EWallet"] = banks
+    for c in dashboard.MONEY_COLS:
+        df[c] = 0
+    df["Credit"] = [1000, 1200, 900, 10 ** 7][:len(banks)]
+    df["_is_anomaly"] = dashboard.compute_anomaly_mask(df)
+    return dashboard._categorize(df)
+
+
+def test_new_category_and_flipped_anomaly_append_a_delta(backup, tmp_path):
+    assert backup.create_backup(_ledger(["BCA", "BCA", "BCA"]))
+    grown = _ledger(["BCA", "BCA", "BCA", "OVO"])
+    grown.loc[2, "_is_anomaly"] = not grown.loc[2, "_is_anomaly"]
+    assert backup.create_backup(grown)
+    names = sorted(n for n in os.listdir(tmp_path) if n.startswith("backup_"))
+    assert [n.endswith(dashboard._DELTA_SUFFIX) for n in names] == [False, True]
+    restored = backup.load_backup()
+    assert restored["Bank/EWallet"].astype(object).tolist() == ["BCA", "BCA", "BCA", "OVO"]
+    assert len(restored) == 4
+
+
+def test_cleanup_keeps_the_base_of_kept_deltas_behind_a_pickle(backup, tmp_path, monkeypatch):
+    names = ["backup_20240101_000000" + dashboard._BASE_SUFFIX, "backup_20240101_000001.pkl",
+             "backup_20240101_000002" + dashboard._DELTA_SUFFIX]
+    for n in names:
+        (tmp_path / n).write_bytes(b"")
+    monkeypatch.setitem(dashboard.CONFIG, "backup_limit", 2)
+    backup.cleanup_old()
+    assert sorted(n for n in os.listdir(tmp_path) if n.startswith("backup_")) == names
+
+
+def _backups(folder):
+    return sorted(n for n in os.listdir(folder) if n.startswith("backup_"))
+
+
+def test_migration_waits_for_the_pickle_compressor(backup, tmp_path):
+    backup._gz_busy.acquire()  # as if _compress_old_pickles were running (also waits out the startup migration)
+    df = pd.DataFrame({"Keterangan": ["makan"], "Credit": [1]})
+    dashboard.BackupManager._write_pickle(str(tmp_path / "backup_20240101_000000.pkl"), df)
+    t = threading.Thread(target=backup.migrate_pickles)
+    t.start()
+    t.join(0.3)
+    assert t.is_alive() and _backups(tmp_path) == ["backup_20240101_000000.pkl"]
+    backup._gz_busy.release()
+    t.join(5)
+    assert _backups(tmp_path) == ["backup_20240101_000000.parquet"]
+    assert not backup._gz_busy.locked()
+
+
+def test_backups_within_one_second_get_distinct_sorted_names(backup, tmp_path, monkeypatch):
+    class _Frozen(dashboard.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2024, 1, 1, 12, 0, 0)
+
+    monkeypatch.setattr(dashboard, "datetime", _Frozen)
+    banks = ["BCA", "BCA", "OVO", "BCA"]
+    for n in range(1, len(banks) + 1):
+        assert backup.create_backup(_ledger(banks[:n]))
+    names = _backups(tmp_path)
+    assert names == ["backup_20240101_120000" + dashboard._BASE_SUFFIX] + [
+        f"backup_20240101_120000_{i:02d}" + dashboard._DELTA_SUFFIX for i in (1, 2, 3)]
+    assert backup.load_backup()["Bank/EWallet"].astype(object).tolist() == banks
+    assert len(backup.load_backup(names[2])) == 3
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+for mod in ("gspread", "oauth2client", "ttkbootstrap"):
+    pytest.importorskip(mod)
+
+import pandas as pd  # noqa: E402
+
+import dashboard  # noqa: E402
+
+App = dashboard.MoneyManagerPro
+
+
+class _Field:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def _data(categorical):
+    rnd = np.random.default_rng(3)
+    n = 300
+    users = rnd.choice(["ani", "Budi", "BUDIMAN", "citra", None], n)
+    day = datetime(2024, 1, 1)
+    df = pd.DataFrame({
+        "No.": range(1, n + 1),
+        "User ID": users,
+        "Bank/EWallet": rnd.choice(["BCA", "OVO", "DANA", None], n),
+        "Credit": rnd.integers(0, 3, n) * 1000,
+        "Debit": rnd.integers(0, 3, n) * 500,
+        "_tgl": [day + timedelta(hours=int(h)) for h in rnd.integers(0, 24 * 10, n)],
+        "_is_anomaly": rnd.random(n) < 0.1,
+    })
+    df.loc[5, "_tgl"] = pd.NaT
+    return dashboard._categorize(df) if categorical else df
+
+
+def _app(data, user="", bank="Semua", kind="Semua", date_from="", date_to="", anomaly=False):
+    app = SimpleNamespace(data=data, user_filter=_Field(user), bank_filter=_Field(bank),
+                          type_filter=_Field(kind), date_from=_Field(date_from), date_to=_Field(date_to),
+                          only_anomaly_var=_Field(anomaly), current_page=4, errors=[],
+                          refresh_table=lambda: None, update_summary=lambda: None, update_charts=lambda: None,
+                          update_status=lambda msg: app.errors.append(msg))
+    App._rebuild_filter_index(app)
+    return app
+
+
+def _reference(d, user="", bank="Semua", kind="Semua", date_from="", date_to="", anomaly=False):
+    keep = pd.Series(True, index=d.index)
+    if user:
+        keep &= d["User ID"].astype(object).map(lambda v: isinstance(v, str) and user.lower() in v.lower())
+    if bank != "Semua":
+        keep &= d["Bank/EWallet"].astype(object) == bank
+    if kind == "Pemasukan":
+        keep &= d["Credit"] > 0
+    elif kind == "Pengeluaran":
+        keep &= d["Debit"] > 0
+    start = datetime.strptime(date_from or "01/01/1900", "%d/%m/%Y")
+    end = datetime.strptime(date_to or "01/01/2100", "%d/%m/%Y") + timedelta(days=1)
+    if date_from or date_to:
+        keep &= (d["_tgl"] >= start) & (d["_tgl"] < end)
+    if anomaly:
+        keep &= d["_is_anomaly"]
+    return d.index[keep].tolist()
+
+
+FILTERS = [
+    {},
+    {"user": "budi"},
+    {"user": "  BUDI "},
+    {"user": "zzz"},
+    {"bank": "OVO"},
+    {"bank": "GOPAY"},  # not among the categories: get_indexer gives -1
+    {"kind": "Pemasukan", "bank": "BCA"},
+    {"kind": "Pengeluaran", "anomaly": True},
+    {"date_from": "03/01/2024"},
+    {"date_to": "03/01/2024"},
+    {"date_from": "03/01/2024", "date_to": "03/01/2024", "user": "a"},
+    {"date_from": "20/01/2024"},
+]
+
+
+@pytest.mark.parametrize("categorical", [True, False])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_apply_filters_matches_reference(categorical, filters):
+    data = _data(categorical)
+    app = _app(data, **filters)
+    App.apply_filters(app, quiet=True)
+    expected = dict(filters, user=filters.get("user", "").strip())
+    assert app.errors == []
+    assert app.filtered_data.index.tolist() == _reference(data, **expected)
+    assert app.current_page == 0
+
+
+def test_missing_user_is_never_matched():
+    data = _data(True)
+    assert data["User ID"].cat.codes.eq(-1).any()
+    app = _app(data, user="n")  # would match the "nan" text of a stringified missing cell
+    App.apply_filters(app, quiet=True)
+    assert app.filtered_data["User ID"].notna().all()
+
+
+def test_keep_page_and_bad_date_are_non_fatal():
+    app = _app(_data(True), bank="OVO")
+    App.apply_filters(app, keep_page=True, quiet=True)
+    assert app.current_page == 4
+    app.date_from.value = "2024-01-03"
+    App.apply_filters(app, quiet=True)
+    assert len(app.errors) == 1
+
+
+def test_empty_data_skips_the_index():
+    app = _app(pd.DataFrame(columns=dashboard.HEADERS), user="x")
+    assert app._fidx is None
+    App.apply_filters(app, quiet=True)
+    assert app.filtered_data.empty
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+for mod in ("gspread", "oauth2client", "ttkbootstrap"):
+    pytest.importorskip(mod)
+
+import pandas as pd  # noqa: E402
+
+import dashboard  # noqa: E402
+
+
+def _anomaly_reference(df):
+    amt = np.maximum(df["Credit"].astype(float), df["Debit"].astype(float))
+    bank = df["Bank/EWallet"].astype(object).where(df["Bank/EWallet"].notna(), "<none>")
+    grp = amt.groupby(bank.to_numpy())
+    mean, std = grp.transform("mean"), grp.transform(lambda s: s.std(ddof=0))
+    return (std > 0) & (amt > mean + dashboard.CONFIG["anomaly_std_multiplier"] * std)
+
+
+def _frame(banks, credit, debit=None):
+    return pd.DataFrame({"Bank/EWallet": banks, "Credit": credit, "Debit": debit or [0] * len(credit)})
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_anomaly_mask_matches_per_bank_reference(categorical):
+    rnd = np.random.default_rng(7)
+    n = 400
+    df = _frame(list(rnd.choice(["BCA", "OVO", "DANA", None], n)),
+                list(rnd.integers(0, 5000, n)), list(rnd.integers(0, 5000, n)))
+    df.loc[rnd.choice(n, 6, replace=False), "Credit"] = 10 ** 7
+    df.loc[n - 1, "Bank/EWallet"] = "SINGLE"
+    if categorical:
+        df["Bank/EWallet"] = df["Bank/EWallet"].astype("category")
+    got = dashboard.compute_anomaly_mask(df)
+    assert got.dtype == bool and got.index.equals(df.index)
+    assert got.tolist() == _anomaly_reference(df).tolist()
+    assert got.any()
+
+
+def test_single_row_bank_is_never_an_anomaly():
+    df = _frame(["BCA"] * 20 + ["OVO"], [100] * 19 + [10 ** 6, 10 ** 9])
+    got = dashboard.compute_anomaly_mask(df)
+    assert got.tolist() == [False] * 19 + [True, False]
+
+
+def test_uncategorized_bank_forms_its_own_group():
+    banks = pd.Categorical(["BCA"] * 20 + [None] * 3, categories=["BCA"])
+    df = _frame(banks, [100] * 20 + [10 ** 8] * 3)
+    assert not dashboard.compute_anomaly_mask(df).any()
+    df.loc[19, "Credit"] = 10 ** 8
+    assert dashboard.compute_anomaly_mask(df).tolist() == [False] * 19 + [True] + [False] * 3
+
+
+def test_empty_frame_gives_empty_mask():
+    got = dashboard.compute_anomaly_mask(_frame([], []))
+    assert got.empty and got.dtype == bool
+
+
+def _balances_reference(df):
+    running = dict.fromkeys(dashboard.BANK_LIST, 0.0)
+    rows = []
+    for r in df.to_dict("records"):
+        bank, user = str(r["Bank/EWallet"]).strip(), str(r["User ID"]).strip().upper()
+        if user == "SYSTEM" and bank.upper() == "SALDO AWAL":
+            running = {b: float(r[b]) if pd.notna(r[b]) else 0.0 for b in dashboard.BANK_LIST}
+        elif bank in running:
+            running[bank] += float(r["Credit"] or 0) - float(r["Debit"] or 0)
+        rows.append([running[b] for b in dashboard.BANK_LIST] + [sum(running.values())])
+    return rows
+
+
+def _transactions(n, seed):
+    rnd = np.random.default_rng(seed)
+    banks = dashboard.BANK_LIST[:4] + ["GOPAY?", " " + dashboard.BANK_LIST[0] + " ", "SALDO AWAL"]
+    df = pd.DataFrame({
+        "User ID": rnd.choice(["u1", "u2"], n).astype(object),
+        "Bank/EWallet": rnd.choice(banks, n),
+        "Credit": rnd.integers(0, 5, n) * 125_000,
+        "Debit": rnd.integers(-1, 5, n) * 70_000,  # a negative debit is a refund
+    })
+    for b in dashboard.BANK_LIST:
+        df[b] = rnd.integers(-10 ** 6, 10 ** 7, n)
+    init = df["Bank/EWallet"] == "SALDO AWAL"
+    df.loc[init, "User ID"] = rnd.choice(["SYSTEM", " system", "u1"], init.sum())
+    df.loc[rnd.choice(n, 3, replace=False), dashboard.BANK_LIST[1]] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_balances_match_the_row_loop(seed):
+    df = _transactions(300, seed)
+    expected = _balances_reference(df)
+    got = dashboard.recompute_all_balances(df.copy())
+    assert got[dashboard.BANK_LIST + ["Saldo Akhir"]].to_numpy(dtype=float).tolist() == expected
+
+
+def test_balances_start_over_at_each_saldo_awal():
+    b0, b1 = dashboard.BANK_LIST[:2]
+    df = pd.DataFrame({"User ID": ["u1", "SYSTEM", "u1", "u2"], "Bank/EWallet": [b0, "SALDO AWAL", b1, "NOPE"],
+                       "Credit": [500, 0, 0, 900], "Debit": [0, 0, 200, 0]})
+    for b in dashboard.BANK_LIST:
+        df[b] = 0
+    df.loc[1, b0], df.loc[1, b1] = 1000, 50
+    got = dashboard.recompute_all_balances(df)
+    assert got[b0].tolist() == [500, 1000, 1000, 1000]
+    assert got[b1].tolist() == [0, 50, -150, -150]
+    assert got["Saldo Akhir"].tolist() == [500, 1050, 850, 850]
+
+
+def test_balances_of_an_empty_frame():
+    df = dashboard.recompute_all_balances(pd.DataFrame(columns=dashboard.HEADERS))
+    assert df.empty and set(dashboard.BANK_LIST) <= set(df.columns)
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+
+for mod in ("gspread", "oauth2client", "ttkbootstrap"):
+    pytest.importorskip(mod)
+
+import pandas as pd  # noqa: E402
+
+import dashboard  # noqa: E402
+
+
+def _row(no, credit, bank="BCA"):
+    row = dict.fromkeys(dashboard.HEADERS, 0)
+    row.update({"No.": no, "Tanggal": "01/02/2024 10:00:00", "User ID": "u1", "Bank/EWallet": bank,
+                "Keterangan": f"row {no}", "Credit": credit, "Debit": 0})
+    return [row[h] for h in dashboard.HEADERS]
+
+
+def _sheet(n):
+    return [list(dashboard.HEADERS)] + [_row(i, 1000 * i) for i in range(1, n + 1)]
+
+
+@pytest.fixture
+def gs():
+    gs = dashboard.GoogleSheetsManager.__new__(dashboard.GoogleSheetsManager)
+    known = _sheet(3)
+    gs.row_count, gs.last_checksum, gs.last_sync = 3, gs._compute_checksum(known), None
+    gs.values = known
+    gs._get_all_values_unformatted = lambda: gs.values
+    return gs
+
+
+def test_tail_returns_only_the_appended_rows(gs):
+    gs.values = _sheet(3) + [_row(4, 5000, "OVO"), _row(5, 250)]
+    tail = gs.get_tail()
+    assert tail["No."].tolist() == [4, 5]
+    assert tail["Credit"].tolist() == [5000, 250] and tail["Bank/EWallet"].tolist() == ["OVO", "BCA"]
+    assert gs.row_count == 5 and gs.last_checksum == gs._compute_checksum(gs.values)
+    assert gs.get_tail() is None  # nothing new since
+
+
+@pytest.mark.parametrize("change", ["edit", "header", "delete", "none"])
+def test_tail_rejects_anything_but_an_append(gs, change):
+    vals = _sheet(4)
+    if change == "edit":
+        vals[2][dashboard.HEADERS.index("Credit")] = 1
+    elif change == "header":
+        vals[0][-1] = "Catatan"
+    elif change == "delete":
+        vals = _sheet(2)
+    elif change == "none":
+        vals = _sheet(3)
+    gs.values = vals
+    before = (gs.row_count, gs.last_checksum)
+    assert gs.get_tail() is None
+    assert (gs.row_count, gs.last_checksum) == before
+
+
+def test_tail_needs_a_known_state(gs):
+    gs.last_checksum = None
+    assert gs.get_tail() is None
+    gs.last_checksum, gs.row_count = "x", 0
+    assert gs.get_tail() is None
+
+
+def _app(base):
+    calls = []
+    return SimpleNamespace(data=base, _tail_syncing=True, calls=calls,
+                           load_data=lambda: calls.append("load_data"),
+                           _extend_data_caches=lambda start: calls.append(("extend", start)),
+                           apply_filters=lambda **kw: calls.append(("filter", kw)),
+                           refresh_user_summary=lambda: calls.append("users"),
+                           update_status=lambda msg: calls.append("status"))
+
+
+def test_apply_tail_falls_back_to_a_full_load():
+    base = pd.DataFrame({"No.": [1, 2]})
+    app = _app(base)
+    dashboard.MoneyManagerPro._apply_tail(app, base, None)
+    assert app.calls == ["load_data"] and not app._tail_syncing and app.data is base
+
+    app = _app(base)
+    app.data = pd.DataFrame({"No.": [1]})  # a full reload replaced the data meanwhile
+    dashboard.MoneyManagerPro._apply_tail(app, base, pd.DataFrame({"No.": [1, 2, 3]}))
+    assert app.calls == ["load_data"] and len(app.data) == 1
+
+
+def test_apply_tail_extends_and_keeps_the_page():
+    base, grown = pd.DataFrame({"No.": [1, 2]}), pd.DataFrame({"No.": [1, 2, 3]})
+    app = _app(base)
+    dashboard.MoneyManagerPro._apply_tail(app, base, grown)
+    assert app.data is grown and not app._tail_syncing
+    assert app.calls[:2] == [("extend", 2), ("filter", {"keep_page": True, "quiet": True})]
+    assert "load_data" not in app.calls